@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere_cipher import criptografar
+from vigenere_servico import HOST_PADRAO, PORTA_PADRAO
+
+BLOCO = "Call me Ishmael. Some years ago, never mind how long precisely. "
+
+
+def gerar_requisicao(operacao, identificador, tamanho, chave):
+    texto = (BLOCO * (tamanho // len(BLOCO) + 1))[:tamanho]
+    if operacao == 'atacar':
+        texto = criptografar(texto.upper(), chave)
+        return {'id': identificador, 'operacao': operacao, 'texto': texto}
+    return {'id': identificador, 'operacao': operacao, 'texto': texto,
+            'chave': chave}
+
+
+async def cliente(host, porta, operacao, requisicoes, tamanho, chave,
+                  contagens):
+    # Envia todas as requisições sem esperar respostas (pipeline) e conta as
+    # respostas por resultado.
+    leitor, escritor = await asyncio.open_connection(host, porta,
+                                                     limit=64 << 20)
+    for identificador in range(requisicoes):
+        requisicao = gerar_requisicao(operacao, identificador, tamanho, chave)
+        escritor.write(json.dumps(requisicao).encode('utf-8') + b'\n')
+    await escritor.drain()
+    for _ in range(requisicoes):
+        resposta = json.loads(await leitor.readline())
+        if resposta['ok']:
+            contagens['ok'] += 1
+        elif resposta['erro'] == 'sobrecarregado':
+            contagens['recusadas'] += 1
+        else:
+            contagens['erros'] += 1
+    escritor.close()
+
+
+async def metricas(host, porta):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    escritor.write(b'{"id": "metricas", "operacao": "metricas"}\n')
+    resposta = json.loads(await leitor.readline())
+    escritor.close()
+    return resposta['resultado']
+
+
+async def executar(args):
+    contagens = {'ok': 0, 'recusadas': 0, 'erros': 0}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(args.host, args.porta, args.operacao, args.requisicoes,
+                args.tamanho, args.chave, contagens)
+        for _ in range(args.conexoes)))
+    duracao = time.perf_counter() - inicio
+    total = args.conexoes * args.requisicoes
+    print(f"{total} requisições em {duracao:.2f} s ({total / duracao:.0f}/s): "
+          f"{contagens['ok']} ok, {contagens['recusadas']} recusadas, "
+          f"{contagens['erros']} erros")
+    print(json.dumps(await metricas(args.host, args.porta), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Gera carga contra o serviço local (vigenere_servico.py).")
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--operacao', default='criptografar',
+                        choices=['criptografar', 'descriptografar', 'atacar'])
+    parser.add_argument('--conexoes', type=int, default=8)
+    parser.add_argument('--requisicoes', type=int, default=100,
+                        help="Requisições por conexão.")
+    parser.add_argument('--tamanho', type=int, default=1000,
+                        help="Caracteres por requisição.")
+    parser.add_argument('--chave', default='SECRETKEY')
+    args = parser.parse_args()
+    asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere_analise import ALFABETO
+from vigenere_ataque import (ataque_frequencia_vigenere, calcular_ic,
+                             encontrar_letra_chave_coluna,
+                             encontrar_tamanho_chave, limpar_texto)
+from vigenere_cipher import criptografar, descriptografar
+from vigenere_idiomas import obter_idioma
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+IDIOMAS_PADRAO = ['ingles', 'portugues']
+CHAVE = 'DESEMPENHO'
+TAMANHO_BLOCO_GERACAO = 1 << 20
+TEMPO_MINIMO = 0.5
+MAX_REPETICOES = 50
+TOLERANCIA_PADRAO = 0.25
+LINHA_BASE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'linha_base.json')
+
+
+def gerar_texto(idioma, tamanho, semente=0):
+    # Letras sorteadas pela tabela de frequências do idioma, em blocos para
+    # não montar uma lista com um item por caractere.
+    pesos_acumulados = list(itertools.accumulate(obter_idioma(idioma).frequencias))
+    gerador = random.Random(f"{idioma}:{semente}")
+    blocos = []
+    restante = tamanho
+    while restante:
+        parte = min(restante, TAMANHO_BLOCO_GERACAO)
+        blocos.append("".join(gerador.choices(ALFABETO, cum_weights=pesos_acumulados,
+                                              k=parte)))
+        restante -= parte
+    return "".join(blocos)
+
+
+def ataque_silencioso(texto_cifrado, idioma):
+    return ataque_frequencia_vigenere(texto_cifrado, idioma=idioma,
+                                      silencioso=True)
+
+
+def medir(funcao, *argumentos, memoria=True):
+    # Menor tempo de várias repetições (até somar TEMPO_MINIMO) e, numa
+    # execução separada sob tracemalloc, o pico de memória alocada.
+    melhor = float('inf')
+    total = 0.0
+    for _ in range(MAX_REPETICOES):
+        inicio = time.perf_counter()
+        funcao(*argumentos)
+        duracao = time.perf_counter() - inicio
+        melhor = min(melhor, duracao)
+        total += duracao
+        if total >= TEMPO_MINIMO:
+            break
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcao(*argumentos)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return melhor, pico
+
+
+def casos(idioma, tamanho):
+    texto_plano = gerar_texto(idioma, tamanho)
+    texto_cifrado = criptografar(texto_plano, CHAVE)
+    texto_limpo = limpar_texto(texto_cifrado, idioma)
+    coluna = texto_limpo[::len(CHAVE)]
+    return [
+        ('criptografar', tamanho, criptografar, (texto_plano, CHAVE)),
+        ('descriptografar', tamanho, descriptografar, (texto_cifrado, CHAVE)),
+        ('limpar_texto', tamanho, limpar_texto, (texto_cifrado, idioma)),
+        ('calcular_ic', tamanho, calcular_ic, (texto_limpo,)),
+        ('encontrar_tamanho_chave', tamanho, encontrar_tamanho_chave,
+         (texto_limpo, 20, 'ic', idioma)),
+        ('encontrar_letra_chave_coluna', len(coluna),
+         encontrar_letra_chave_coluna, (coluna, idioma)),
+        ('ataque_frequencia_vigenere', tamanho, ataque_silencioso,
+         (texto_cifrado, idioma)),
+    ]
+
+
+def executar(idiomas, tamanhos, memoria=True):
+    resultados = {}
+    for idioma in idiomas:
+        for tamanho in tamanhos:
+            for nome, tamanho_entrada, funcao, argumentos in casos(idioma, tamanho):
+                segundos, pico = medir(funcao, *argumentos, memoria=memoria)
+                chave_resultado = f"{idioma}/{nome}/{tamanho}"
+                resultados[chave_resultado] = {
+                    'segundos': segundos,
+                    'mb_por_segundo': tamanho_entrada / segundos / 1e6 if segundos else None,
+                    'pico_memoria_bytes': pico,
+                }
+                pico_texto = f"{pico / 1e6:>10.1f}" if pico is not None else f"{'-':>10}"
+                print(f"{chave_resultado:<52} {segundos:>10.6f} "
+                      f"{resultados[chave_resultado]['mb_por_segundo']:>10.2f} {pico_texto}",
+                      flush=True)
+    return resultados
+
+
+def comparar(resultados, linha_base, tolerancia):
+    # Regressão: vazão abaixo de (1 - tolerancia) da linha de base ou pico
+    # de memória acima de (1 + tolerancia).
+    regressoes = []
+    for chave_resultado, atual in resultados.items():
+        base = linha_base.get(chave_resultado)
+        if base is None:
+            continue
+        if (base['mb_por_segundo'] and atual['mb_por_segundo'] is not None and
+                atual['mb_por_segundo'] < (1 - tolerancia) * base['mb_por_segundo']):
+            regressoes.append(f"{chave_resultado}: vazão {atual['mb_por_segundo']:.2f} MB/s "
+                              f"(linha de base {base['mb_por_segundo']:.2f} MB/s)")
+        if (base['pico_memoria_bytes'] and atual['pico_memoria_bytes'] is not None and
+                atual['pico_memoria_bytes'] > (1 + tolerancia) * base['pico_memoria_bytes']):
+            regressoes.append(f"{chave_resultado}: memória {atual['pico_memoria_bytes']} bytes "
+                              f"(linha de base {base['pico_memoria_bytes']} bytes)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede vazão e pico de memória da cifra e do ataque.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--idiomas', nargs='+', default=IDIOMAS_PADRAO)
+    parser.add_argument('--saida', help="Grava os resultados em JSON.")
+    parser.add_argument('--linha-base', default=LINHA_BASE_PADRAO,
+                        help="JSON de referência para detectar regressões.")
+    parser.add_argument('--salvar-linha-base', action='store_true',
+                        help="Grava os resultados como nova linha de base.")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO)
+    parser.add_argument('--sem-memoria', action='store_true',
+                        help="Não mede o pico de memória (mais rápido).")
+    args = parser.parse_args()
+
+    print(f"Python {platform.python_version()}, {platform.machine()}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'Caso':<52} {'Tempo (s)':>10} {'MB/s':>10} {'Pico (MB)':>10}")
+    resultados = executar(args.idiomas, args.tamanhos, not args.sem_memoria)
+    relatorio = {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, sort_keys=True)
+    if args.salvar_linha_base:
+        with open(args.linha_base, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, sort_keys=True)
+        return
+
+    if os.path.exists(args.linha_base):
+        with open(args.linha_base, encoding='utf-8') as arquivo:
+            linha_base = json.load(arquivo)['resultados']
+        regressoes = comparar(resultados, linha_base, args.tolerancia)
+        if regressoes:
+            print("\nRegressões:")
+            for regressao in regressoes:
+                print(f"   {regressao}")
+            sys.exit(1)
+        print("\nNenhuma regressão em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere_cipher import (_tabela_bytes, _tabela_texto, criptografar,
+                             gerar_chave)
+
+TAMANHOS_PADRAO = [1_000, 1_000_000, 100_000_000, 1_000_000_000]
+BLOCO = "Call me Ishmael. Some years ago, never mind how long precisely. "
+
+
+def gerar_mensagem(tamanho):
+    return (BLOCO * (tamanho // len(BLOCO) + 1))[:tamanho]
+
+
+def medir_pico(funcao, *argumentos):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*argumentos)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return pico, duracao
+
+
+def medir_criptografar(mensagem, chave):
+    # Com as tabelas fora do cache, o pico dentro de criptografar inclui a
+    # construção do estado da chave. A mensagem já existe antes da medição;
+    # o que resta além da cópia de trabalho e da saída (2·N) é o custo da
+    # chave, que deve ficar constante quando N cresce.
+    _tabela_bytes.cache_clear()
+    _tabela_texto.cache_clear()
+    pico, duracao = medir_pico(criptografar, mensagem, chave)
+    return pico, pico - 2 * len(mensagem), duracao
+
+
+def formatar_bytes(valor):
+    for unidade in ('B', 'KB', 'MB', 'GB'):
+        if valor < 1024 or unidade == 'GB':
+            return f"{valor:.1f} {unidade}"
+        valor /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede a memória usada pela chave em criptografar.")
+    parser.add_argument('--chave', default='SECRETKEY')
+    parser.add_argument('--tamanhos', type=int, nargs='+',
+                        default=TAMANHOS_PADRAO)
+    parser.add_argument('--limite-legado', type=int, default=10_000_000,
+                        help="Maior mensagem medida com gerar_chave.")
+    args = parser.parse_args()
+
+    print(f"{'Tamanho':>12} {'gerar_chave':>14} {'Pico cifra':>14} "
+          f"{'Pico - 2N':>14} {'Pico/N':>8} {'MB/s':>10}")
+    for tamanho in args.tamanhos:
+        mensagem = gerar_mensagem(tamanho)
+
+        if tamanho <= args.limite_legado:
+            pico_legado, _ = medir_pico(gerar_chave, mensagem, args.chave)
+            legado = formatar_bytes(pico_legado)
+        else:
+            legado = '-'
+
+        pico, custo_chave, duracao = medir_criptografar(mensagem, args.chave)
+        vazao = tamanho / duracao / 1e6 if duracao else float('inf')
+        print(f"{tamanho:>12} {legado:>14} {formatar_bytes(pico):>14} "
+              f"{formatar_bytes(custo_chave):>14} {pico / tamanho:>8.2f} {vazao:>10.1f}")
+        del mensagem
+
+
+if __name__ == "__main__":
+    main()
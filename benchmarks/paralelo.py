@@ -0,0 +1,60 @@
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere_cipher import criptografar_arquivo_paralelo
+
+BLOCO = "Call me Ishmael. Some years ago, never mind how long precisely. "
+
+
+def gerar_arquivo(caminho, tamanho):
+    with open(caminho, 'w', encoding='ascii') as arquivo:
+        repeticoes = (1 << 20) // len(BLOCO)
+        bloco = BLOCO * repeticoes
+        escritos = 0
+        while escritos < tamanho:
+            parte = bloco[:tamanho - escritos]
+            arquivo.write(parte)
+            escritos += len(parte)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o ganho da criptografia paralela de arquivos.")
+    parser.add_argument('--tamanho', type=int, default=256 << 20)
+    parser.add_argument('--chave', default='SECRETKEY')
+    parser.add_argument('--trabalhadores', type=int, nargs='+',
+                        default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        entrada = os.path.join(diretorio, 'entrada.txt')
+        gerar_arquivo(entrada, args.tamanho)
+        print(f"Arquivo: {args.tamanho} bytes, {os.cpu_count()} CPUs")
+        print(f"{'Trabalhadores':>14} {'Tempo (s)':>10} {'MB/s':>10} {'Ganho':>8}")
+
+        referencia = None
+        tempo_base = None
+        for trabalhadores in args.trabalhadores:
+            saida = os.path.join(diretorio, f'saida_{trabalhadores}.txt')
+            inicio = time.perf_counter()
+            criptografar_arquivo_paralelo(entrada, saida, args.chave,
+                                          trabalhadores)
+            duracao = time.perf_counter() - inicio
+            if referencia is None:
+                referencia = saida
+                tempo_base = duracao
+            elif not filecmp.cmp(referencia, saida, shallow=False):
+                raise RuntimeError(
+                    f"Saída com {trabalhadores} trabalhadores difere da referência.")
+            print(f"{trabalhadores:>14} {duracao:>10.3f} "
+                  f"{args.tamanho / duracao / 1e6:>10.1f} {tempo_base / duracao:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
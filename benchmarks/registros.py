@@ -0,0 +1,58 @@
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere_cipher import criptografar, criptografar_lote
+
+CARACTERES_CAMPO = string.ascii_letters + string.digits + ' @.-'
+
+
+def gerar_registros(quantidade, semente=0):
+    # Campos curtos de banco de dados, cada um com sua própria chave.
+    gerador = random.Random(semente)
+    mensagens = [''.join(gerador.choices(CARACTERES_CAMPO, k=gerador.randint(5, 25)))
+                 for _ in range(quantidade)]
+    chaves = [''.join(gerador.choices(string.ascii_uppercase, k=gerador.randint(4, 12)))
+              for _ in range(quantidade)]
+    return mensagens, chaves
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara criptografar registro a registro com criptografar_lote.")
+    parser.add_argument('--registros', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    mensagens, chaves = gerar_registros(args.registros)
+    print(f"{args.registros} registros, {sum(map(len, mensagens))} caracteres")
+    print(f"{'Modo':>22} {'Tempo (s)':>10} {'Registros/s':>12} {'Ganho':>8}")
+
+    referencia = None
+    tempo_base = None
+    modos = [
+        ('caractere', lambda: [criptografar(mensagem, chave, 'caractere')
+                               for mensagem, chave in zip(mensagens, chaves)]),
+        ('tabela', lambda: [criptografar(mensagem, chave)
+                            for mensagem, chave in zip(mensagens, chaves)]),
+        ('lote', lambda: criptografar_lote(mensagens, chaves)),
+    ]
+    for nome, funcao in modos:
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        if referencia is None:
+            referencia = resultado
+            tempo_base = duracao
+        elif resultado != referencia:
+            raise RuntimeError(f"Saída do modo {nome} difere da referência.")
+        print(f"{nome:>22} {duracao:>10.3f} {args.registros / duracao:>12.0f} "
+              f"{tempo_base / duracao:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import collections
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vigenere_analise as analise
+from vigenere_ataque import _tabela_limpeza, atacar, limpar_texto
+from vigenere_cache import CacheAtaque
+from vigenere_cipher import criptografar
+from vigenere_idiomas import idiomas_disponiveis, obter_idioma
+from vigenere_incremental import AtaqueIncremental
+
+# Textos sorteados com as frequências do inglês e cifrados com chaves
+# aleatórias; as rotinas otimizadas são comparadas com a varredura completa
+# e com o ataque original, reproduzido abaixo.
+INGLES = obter_idioma('ingles')
+REPETICOES = 30
+
+
+def texto_ingles(gerador, tamanho):
+    letras = gerador.choices(analise.ALFABETO, INGLES.frequencias, k=tamanho)
+    for i in range(0, tamanho, 7):
+        letras[i] = letras[i].lower() + gerador.choice(" ,.\n")
+    return "".join(letras)
+
+
+def chave_aleatoria(gerador, max_tamanho=12):
+    return "".join(gerador.choices(analise.ALFABETO, k=gerador.randint(1, max_tamanho)))
+
+
+def ataque_original(texto_limpo, max_tam_chave):
+    # Algoritmo da primeira versão do ataque: IC médio das colunas com mais
+    # de uma letra e qui-quadrado de cada deslocamento.
+    def ic(texto):
+        n = len(texto)
+        contagens = collections.Counter(texto).values()
+        return sum(c * (c - 1) for c in contagens) / (n * (n - 1))
+
+    melhor_tam_chave, min_diferenca = 1, float('inf')
+    for tam_chave in range(1, max_tam_chave + 1):
+        colunas = [coluna for coluna in (texto_limpo[i::tam_chave]
+                                         for i in range(tam_chave))
+                   if len(coluna) > 1]
+        if colunas:
+            diferenca = abs(sum(map(ic, colunas)) / len(colunas) - INGLES.ic)
+            if diferenca < min_diferenca:
+                melhor_tam_chave, min_diferenca = tam_chave, diferenca
+
+    chave = ""
+    for i in range(melhor_tam_chave):
+        coluna = texto_limpo[i::melhor_tam_chave]
+        melhor_qui, melhor_deslocamento = float('inf'), 0
+        for deslocamento in range(26):
+            contagens = collections.Counter(
+                chr((ord(c) - ord('A') - deslocamento) % 26 + ord('A'))
+                for c in coluna)
+            qui = sum((contagens[letra] - frequencia * len(coluna)) ** 2 /
+                      (frequencia * len(coluna))
+                      for letra, frequencia in zip(analise.ALFABETO,
+                                                   INGLES.frequencias))
+            if qui < melhor_qui:
+                melhor_qui, melhor_deslocamento = qui, deslocamento
+        chave += analise.ALFABETO[melhor_deslocamento]
+    return melhor_tam_chave, chave
+
+
+class TesteAtaque(unittest.TestCase):
+    def setUp(self):
+        self.gerador = random.Random(20261018)
+
+    def cifrado_aleatorio(self, tamanho_minimo=200, tamanho_maximo=3000):
+        texto = texto_ingles(self.gerador,
+                             self.gerador.randint(tamanho_minimo, tamanho_maximo))
+        return criptografar(texto, chave_aleatoria(self.gerador))
+
+    def test_ataque_igual_ao_original(self):
+        for _ in range(REPETICOES):
+            cifrado = self.cifrado_aleatorio()
+            resultado = atacar(cifrado, 20, idioma='ingles')
+            self.assertEqual((resultado.tamanho_chave, resultado.chave),
+                             ataque_original(limpar_texto(cifrado), 20))
+
+    def test_ics_incrementais_iguais_a_varredura(self):
+        for _ in range(REPETICOES):
+            cifrado = self.cifrado_aleatorio(0)
+            max_tam_chave = self.gerador.randint(1, 24)
+            ataque = AtaqueIncremental(max_tam_chave, 'ingles')
+            inicio = 0
+            while inicio < len(cifrado):
+                fim = inicio + self.gerador.randint(1, 500)
+                ataque.adicionar(cifrado[inicio:fim])
+                inicio = fim
+            esperado = analise.ics_por_tamanho(limpar_texto(cifrado), max_tam_chave)
+            self.assertEqual(ataque.ics().keys(), esperado.keys())
+            for tam_chave, ic in esperado.items():
+                self.assertAlmostEqual(ataque.ics()[tam_chave], ic, places=12)
+
+    def test_tamanho_incremental_igual_ao_completo(self):
+        for metodo in analise.METODOS_TAMANHO:
+            for _ in range(REPETICOES // 3):
+                cifrado = self.cifrado_aleatorio()
+                ataque = AtaqueIncremental(20, 'ingles', metodo)
+                inicio = 0
+                while inicio < len(cifrado):
+                    fim = inicio + self.gerador.randint(1, 500)
+                    ataque.adicionar(cifrado[inicio:fim])
+                    inicio = fim
+                    self.assertEqual(
+                        ataque.estimativa().tamanho_chave,
+                        analise.encontrar_tamanho_chave(
+                            limpar_texto(cifrado[:fim]), INGLES.ic, 20, metodo),
+                        (metodo, fim))
+
+    def test_limpar_igual_a_translate(self):
+        # Latin-1 (caminho rápido), caracteres que viram várias letras e
+        # códigos fora do Latin-1, que passam pelo tratador de erros.
+        alfabeto = ([chr(codigo) for codigo in range(0x250)] +
+                    list("ẞŒœĦŦ€—“”😀中ḞẞǄǅ́") + ["ﬁ", "Å"])
+        for nome in idiomas_disponiveis() + ['auto']:
+            tabela = _tabela_limpeza(nome)
+            for _ in range(REPETICOES):
+                texto = "".join(self.gerador.choices(
+                    alfabeto, k=self.gerador.randint(0, 300)))
+                self.assertEqual(tabela.limpar(texto), texto.translate(tabela),
+                                 (nome, texto))
+
+    def test_cache_estende_ics(self):
+        # Depois de max_tam_chave=10, pedir 20 calcula só os tamanhos 11..20
+        # e o resultado é o mesmo da varredura completa.
+        cache = CacheAtaque()
+        for _ in range(REPETICOES // 3):
+            texto_limpo = limpar_texto(self.cifrado_aleatorio())
+            self.assertEqual(cache.ics(texto_limpo, 10),
+                             analise.ics_por_tamanho(texto_limpo, 10))
+            with mock.patch.object(analise, 'ics_tamanhos',
+                                   wraps=analise.ics_tamanhos) as ics_tamanhos:
+                self.assertEqual(cache.ics(texto_limpo, 20),
+                                 analise.ics_por_tamanho(texto_limpo, 20))
+            ics_tamanhos.assert_called_once()
+            self.assertEqual(list(ics_tamanhos.call_args.args[1]), list(range(11, 21)))
+            self.assertEqual(cache.ics(texto_limpo, 15),
+                             analise.ics_por_tamanho(texto_limpo, 15))
+
+
+if __name__ == '__main__':
+    unittest.main()
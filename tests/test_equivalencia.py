@@ -0,0 +1,113 @@
+import io
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere_cipher import (criptografar, criptografar_fluxo,
+                             criptografar_lote, descriptografar,
+                             descriptografar_fluxo, descriptografar_lote)
+
+# O motor 'caractere' é a referência: os demais caminhos devem produzir
+# exatamente o mesmo texto para qualquer mensagem e chave. Letras não
+# ASCII também são deslocadas e nem sempre voltam ao original, então a
+# decifragem é comparada com a da referência, não com a mensagem.
+ASCII = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz 0123456789.,;:!?-\n\t"
+NAO_ASCII = "áéíóúâêôãõçÁÉÍÓÚÂÊÔÃÕÇñü€—“”😀中"
+CHAVES_FIXAS = ["LEMON", "lemon", "LeMoN", "A", "a", "CHAVE SECRETA", "k3y!",
+                "Ação", "😀B", " ", "z" * 40]
+REPETICOES = 200
+
+
+def texto_aleatorio(gerador, tamanho, alfabeto):
+    return "".join(gerador.choice(alfabeto) for _ in range(tamanho))
+
+
+def chave_aleatoria(gerador):
+    if gerador.random() < 0.3:
+        return gerador.choice(CHAVES_FIXAS)
+    alfabeto = gerador.choice([ASCII, ASCII + NAO_ASCII, ASCII[:26], ASCII[26:52]])
+    return texto_aleatorio(gerador, gerador.randint(1, 12), alfabeto)
+
+
+def mensagem_aleatoria(gerador, tamanho_maximo=120):
+    alfabeto = ASCII if gerador.random() < 0.5 else ASCII + NAO_ASCII
+    return texto_aleatorio(gerador, gerador.randint(0, tamanho_maximo), alfabeto)
+
+
+class TesteEquivalencia(unittest.TestCase):
+    def setUp(self):
+        self.gerador = random.Random(20261018)
+
+    def test_motor_tabela_igual_ao_caractere(self):
+        for _ in range(REPETICOES):
+            mensagem = mensagem_aleatoria(self.gerador)
+            chave = chave_aleatoria(self.gerador)
+            cifrado = criptografar(mensagem, chave, 'caractere')
+            self.assertEqual(criptografar(mensagem, chave, 'tabela'), cifrado,
+                             (mensagem, chave))
+            self.assertEqual(descriptografar(cifrado, chave, 'tabela'),
+                             descriptografar(cifrado, chave, 'caractere'),
+                             (mensagem, chave))
+
+    def test_fase_continua_a_chave(self):
+        for _ in range(REPETICOES):
+            mensagem = mensagem_aleatoria(self.gerador)
+            chave = chave_aleatoria(self.gerador)
+            corte = self.gerador.randint(0, len(mensagem))
+            cifrado = criptografar(mensagem, chave, 'caractere')
+            decifrado = descriptografar(cifrado, chave, 'caractere')
+            for motor in ('tabela', 'caractere'):
+                self.assertEqual(criptografar(mensagem[corte:], chave, motor, corte),
+                                 cifrado[corte:], (mensagem, chave, corte, motor))
+                self.assertEqual(descriptografar(cifrado[corte:], chave, motor, corte),
+                                 decifrado[corte:], (mensagem, chave, corte, motor))
+
+    def test_lote_igual_ao_escalar(self):
+        for _ in range(REPETICOES // 4):
+            mensagens = [mensagem_aleatoria(self.gerador, 40)
+                         for _ in range(self.gerador.randint(0, 30))]
+            chaves = [chave_aleatoria(self.gerador) for _ in mensagens]
+            registros_por_lote = self.gerador.randint(1, 8)
+            esperado = [criptografar(mensagem, chave, 'caractere')
+                        for mensagem, chave in zip(mensagens, chaves)]
+            self.assertEqual(criptografar_lote(mensagens, chaves, registros_por_lote),
+                             esperado)
+            self.assertEqual(descriptografar_lote(esperado, chaves, registros_por_lote),
+                             [descriptografar(cifrado, chave, 'caractere')
+                              for cifrado, chave in zip(esperado, chaves)])
+
+    def test_lote_com_chave_unica(self):
+        mensagens = [mensagem_aleatoria(self.gerador, 40) for _ in range(50)]
+        for chave in CHAVES_FIXAS:
+            self.assertEqual(criptografar_lote(mensagens, chave, 7),
+                             [criptografar(mensagem, chave, 'caractere')
+                              for mensagem in mensagens])
+
+    def test_fluxo_com_utf8_dividido_entre_blocos(self):
+        for _ in range(REPETICOES // 4):
+            mensagem = mensagem_aleatoria(self.gerador, 300)
+            chave = chave_aleatoria(self.gerador)
+            # Blocos de 1 a 5 bytes cortam caracteres de 2, 3 e 4 bytes.
+            tamanho_bloco = self.gerador.randint(1, 5)
+            cifrado = criptografar(mensagem, chave, 'caractere')
+
+            saida = io.BytesIO()
+            total = criptografar_fluxo(io.BytesIO(mensagem.encode('utf-8')), saida,
+                                       chave, tamanho_bloco)
+            self.assertEqual(total, len(mensagem))
+            self.assertEqual(saida.getvalue().decode('utf-8'), cifrado,
+                             (mensagem, chave, tamanho_bloco))
+
+            saida = io.BytesIO()
+            descriptografar_fluxo(io.BytesIO(cifrado.encode('utf-8')), saida,
+                                  chave, tamanho_bloco)
+            self.assertEqual(saida.getvalue().decode('utf-8'),
+                             descriptografar(cifrado, chave, 'caractere'),
+                             (mensagem, chave, tamanho_bloco))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,297 @@
+import array
+import collections
+
+ALFABETO = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LETRAS = ALFABETO.encode('ascii')
+METODOS_TAMANHO = ('ic', 'kasiski', 'combinado')
+TAM_NGRAMA_PADRAO = 3
+MAX_DISTANCIA_PADRAO = 100_000
+# Número primo de baldes do índice de n-gramas: limita a memória do índice
+# (32 MB) independentemente do tamanho do texto.
+NUM_BALDES_KASISKI = 4_194_301
+TOLERANCIA_KASISKI = 0.9
+NUM_CANDIDATOS_COMBINADO = 5
+IC_ALEATORIO = 1 / 26
+
+
+def codificar(texto_limpo):
+    if isinstance(texto_limpo, str):
+        return texto_limpo.encode('ascii')
+    return bytes(texto_limpo)
+
+
+def contar_letras(dados):
+    return [dados.count(letra) for letra in LETRAS]
+
+
+def contagens_colunas(dados, tam_chave):
+    return [contar_letras(dados[i::tam_chave]) for i in range(tam_chave)]
+
+
+def ic_contagens(contagens):
+    n = sum(contagens)
+    if n < 2:
+        return 0.0
+    soma_ic = sum(contagem * (contagem - 1) for contagem in contagens)
+    return soma_ic / (n * (n - 1))
+
+
+def expandir_contagens(contar_diretamente, max_tam_chave):
+    # Gera (tamanho, contagens por coluna) do maior para o menor tamanho.
+    # Só os tamanhos acima de max_tam_chave // 2 são contados no texto; a
+    # coluna j de um tamanho t é a união das colunas j, j + t, ... do tamanho
+    # 2t, então os demais saem da soma de contagens já calculadas.
+    pendentes = {}
+    for tam_chave in range(max_tam_chave, 0, -1):
+        if 2 * tam_chave <= max_tam_chave:
+            dobro = pendentes.pop(2 * tam_chave)
+            contagens = [
+                [a + b for a, b in zip(dobro[i], dobro[i + tam_chave])]
+                for i in range(tam_chave)]
+        else:
+            contagens = contar_diretamente(tam_chave)
+        if tam_chave % 2 == 0:
+            pendentes[tam_chave] = contagens
+        yield tam_chave, contagens
+
+
+def matrizes_contagens(dados, max_tam_chave):
+    return expandir_contagens(
+        lambda tam_chave: contagens_colunas(dados, tam_chave), max_tam_chave)
+
+
+def ic_medio_colunas(contagens):
+    ic_medio = 0.0
+    num_colunas_validas = 0
+    for contagens_coluna in contagens:
+        if sum(contagens_coluna) > 1:
+            ic_medio += ic_contagens(contagens_coluna)
+            num_colunas_validas += 1
+    if num_colunas_validas == 0:
+        return None
+    return ic_medio / num_colunas_validas
+
+
+def ics_por_tamanho(texto_limpo, max_tam_chave=20):
+    dados = codificar(texto_limpo)
+    ics = {}
+    for tam_chave, contagens in matrizes_contagens(dados, max_tam_chave):
+        ic_medio = ic_medio_colunas(contagens)
+        if ic_medio is not None:
+            ics[tam_chave] = ic_medio
+    return dict(sorted(ics.items()))
+
+
+def ics_tamanhos(texto_limpo, tamanhos):
+    dados = codificar(texto_limpo)
+    ics = {}
+    for tam_chave in sorted(tamanhos):
+        ic_medio = ic_medio_colunas(contagens_colunas(dados, tam_chave))
+        if ic_medio is not None:
+            ics[tam_chave] = ic_medio
+    return ics
+
+
+def escolher_tamanho_chave(ics, ic_alvo):
+    melhor_tam_chave = 1
+    min_diferenca = float('inf')
+    for tam_chave, ic_medio in sorted(ics.items()):
+        diferenca = abs(ic_medio - ic_alvo)
+        if diferenca < min_diferenca:
+            min_diferenca = diferenca
+            melhor_tam_chave = tam_chave
+    return melhor_tam_chave
+
+
+class HistogramaDistancias:
+    # Índice de hash rolante: cada balde guarda a última posição do n-grama
+    # que caiu nele. A distância até a repetição anterior entra no
+    # histograma; fora do modo exato, cada balde guarda também o n-grama
+    # inteiro para descartar colisões de hash. adicionar pode ser chamado
+    # com blocos seguidos do mesmo texto: o índice, o hash das últimas
+    # letras e a posição corrente ficam entre as chamadas, e nenhuma letra
+    # já vista é guardada.
+    def __init__(self, tam_ngrama=TAM_NGRAMA_PADRAO,
+                 max_distancia=MAX_DISTANCIA_PADRAO):
+        if tam_ngrama < 2:
+            raise ValueError("O tamanho do n-grama deve ser pelo menos 2.")
+        combinacoes = 26 ** tam_ngrama
+        self.tam_ngrama = tam_ngrama
+        self.max_distancia = max_distancia
+        self.exato = combinacoes <= NUM_BALDES_KASISKI
+        num_baldes = combinacoes if self.exato else NUM_BALDES_KASISKI
+        self.num_baldes = num_baldes
+        self.ultima_posicao = array.array('q', [-1]) * num_baldes
+        if self.exato:
+            self.ngramas = None
+        elif combinacoes <= 1 << 63:
+            self.ngramas = array.array('q', [0]) * num_baldes
+        else:
+            self.ngramas = [0] * num_baldes
+        self.modulo = 26 ** (tam_ngrama - 1)
+        self.histograma = collections.Counter()
+        self.valor_hash = 0
+        self.posicao = 0
+
+    def adicionar(self, dados):
+        ultima_posicao = self.ultima_posicao
+        ngramas = self.ngramas
+        histograma = self.histograma
+        modulo = self.modulo
+        num_baldes = self.num_baldes
+        max_distancia = self.max_distancia
+        primeiro_fim = self.tam_ngrama - 1
+        valor_hash = self.valor_hash
+        for fim, letra in enumerate(dados, self.posicao):
+            valor_hash = (valor_hash % modulo) * 26 + letra - ord('A')
+            if fim < primeiro_fim:
+                continue
+            if ngramas is None:
+                balde = valor_hash
+            else:
+                balde = valor_hash % num_baldes
+                mesmo_ngrama = ngramas[balde] == valor_hash
+                ngramas[balde] = valor_hash
+            anterior = ultima_posicao[balde]
+            ultima_posicao[balde] = fim
+            if anterior < 0 or fim - anterior > max_distancia:
+                continue
+            if ngramas is not None and not mesmo_ngrama:
+                continue
+            histograma[fim - anterior] += 1
+        self.valor_hash = valor_hash
+        self.posicao += len(dados)
+        return self.histograma
+
+
+def histograma_distancias(dados, tam_ngrama=TAM_NGRAMA_PADRAO,
+                          max_distancia=MAX_DISTANCIA_PADRAO):
+    return HistogramaDistancias(tam_ngrama, max_distancia).adicionar(dados)
+
+
+def pontuacoes_kasiski(histograma, max_tam_chave=20):
+    # Votos de divisores normalizados pela fração esperada ao acaso (1/k):
+    # perto de 1 para tamanhos sem relação com a chave, maiores para o
+    # período verdadeiro e seus múltiplos.
+    total = sum(histograma.values())
+    if total == 0:
+        return {}
+    max_distancia = max(histograma)
+    por_distancia = [0] * (max_distancia + 1)
+    for distancia, contagem in histograma.items():
+        por_distancia[distancia] = contagem
+    pontuacoes = {}
+    for tam_chave in range(2, max_tam_chave + 1):
+        votos = sum(por_distancia[tam_chave::tam_chave])
+        pontuacoes[tam_chave] = votos * tam_chave / total
+    return pontuacoes
+
+
+def candidatos_kasiski(texto_limpo, max_tam_chave=20,
+                       tam_ngrama=TAM_NGRAMA_PADRAO,
+                       max_distancia=MAX_DISTANCIA_PADRAO):
+    histograma = histograma_distancias(codificar(texto_limpo), tam_ngrama,
+                                       max_distancia)
+    return candidatos_histograma(histograma, max_tam_chave)
+
+
+def candidatos_histograma(histograma, max_tam_chave=20):
+    pontuacoes = pontuacoes_kasiski(histograma, max_tam_chave)
+    return sorted(pontuacoes.items(), key=lambda item: (-item[1], item[0]))
+
+
+def escolher_tamanho_kasiski(candidatos, tolerancia=TOLERANCIA_KASISKI):
+    # Múltiplos do período recebem a mesma pontuação normalizada; fica o
+    # menor tamanho próximo do melhor.
+    if not candidatos:
+        return 1
+    melhor_pontuacao = candidatos[0][1]
+    return min(tam_chave for tam_chave, pontuacao in candidatos
+               if pontuacao >= tolerancia * melhor_pontuacao)
+
+
+def encontrar_tamanho_chave(texto_limpo, ic_alvo, max_tam_chave=20,
+                            metodo='ic'):
+    if metodo not in METODOS_TAMANHO:
+        raise ValueError(
+            f"Método desconhecido: {metodo!r}. "
+            f"Use um de: {', '.join(METODOS_TAMANHO)}.")
+    if metodo == 'ic':
+        return escolher_tamanho_chave(
+            ics_por_tamanho(texto_limpo, max_tam_chave), ic_alvo)
+
+    candidatos = candidatos_kasiski(texto_limpo, max_tam_chave)
+    if metodo == 'kasiski':
+        return escolher_tamanho_kasiski(candidatos)
+    if not candidatos:
+        return escolher_tamanho_chave(
+            ics_por_tamanho(texto_limpo, max_tam_chave), ic_alvo)
+    tamanhos = [tam_chave for tam_chave, _ in
+                candidatos[:NUM_CANDIDATOS_COMBINADO]]
+    return escolher_tamanho_combinado(
+        candidatos, ics_tamanhos(texto_limpo, tamanhos), ic_alvo)
+
+
+def escolher_tamanho_combinado(candidatos, ics, ic_alvo):
+    # Combinado: Kasiski restringe os tamanhos e o IC decide entre eles. Os
+    # múltiplos do período têm o mesmo IC que ele, então vale o menor
+    # candidato cujo excesso de IC sobre o acaso é próximo do maior excesso.
+    # ics precisa cobrir ao menos os NUM_CANDIDATOS_COMBINADO primeiros.
+    tamanhos = {tam_chave for tam_chave, _ in
+                candidatos[:NUM_CANDIDATOS_COMBINADO]}
+    ics = {tam_chave: ic_medio for tam_chave, ic_medio in sorted(ics.items())
+           if tam_chave in tamanhos}
+    if not ics:
+        return escolher_tamanho_kasiski(candidatos)
+    maior_excesso = max(ics.values()) - IC_ALEATORIO
+    for tam_chave, ic_medio in ics.items():
+        if ic_medio - IC_ALEATORIO >= TOLERANCIA_KASISKI * maior_excesso:
+            return tam_chave
+    return escolher_tamanho_chave(ics, ic_alvo)
+
+
+def menor_periodo(chave):
+    # "ABCABC" decifra igual a "ABC": reduz a chave ao seu menor período.
+    tam_chave = len(chave)
+    for periodo in range(1, tam_chave):
+        if tam_chave % periodo == 0 and chave == chave[:periodo] * (tam_chave // periodo):
+            return chave[:periodo]
+    return chave
+
+
+def vetor_frequencias(frequencias):
+    return [frequencias[letra] for letra in ALFABETO]
+
+
+def pontuar_deslocamentos(contagens, vetor_esperado):
+    # Qui-quadrado de cada um dos 26 deslocamentos a partir do histograma da
+    # coluna: decifrar com o deslocamento d leva a letra cifrada (l + d) % 26
+    # para l, então cada pontuação é uma rotação das contagens.
+    n = sum(contagens)
+    if n == 0:
+        return [float('inf')] * 26
+
+    esperados = [frequencia * n for frequencia in vetor_esperado]
+    pontuacoes = []
+    for deslocamento in range(26):
+        valor_qui_quadrado = 0.0
+        for letra, esperado in enumerate(esperados):
+            observado = contagens[(letra + deslocamento) % 26]
+            if esperado == 0:
+                if observado > 0:
+                    valor_qui_quadrado += float('inf')
+            else:
+                valor_qui_quadrado += ((observado - esperado)**2) / esperado
+        pontuacoes.append(valor_qui_quadrado)
+    return pontuacoes
+
+
+def ranquear_deslocamentos(pontuacoes):
+    ordem = sorted(range(26), key=pontuacoes.__getitem__)
+    return [(ALFABETO[deslocamento], pontuacoes[deslocamento])
+            for deslocamento in ordem]
+
+
+def pontuar_coluna(texto_coluna, vetor_esperado):
+    contagens = contar_letras(codificar(texto_coluna))
+    return ranquear_deslocamentos(pontuar_deslocamentos(contagens, vetor_esperado))
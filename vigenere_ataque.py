@@ -0,0 +1,406 @@
+import collections
+import functools
+import heapq
+import time
+
+import vigenere_analise as analise
+from vigenere_cipher import descriptografar
+from vigenere_eventos import (FASE_COLUNA, FASE_COLUNAS, FASE_DECIFRAGEM,
+                              FASE_DETECCAO_IDIOMA, FASE_LIMPEZA,
+                              FASE_TAMANHO_CHAVE, OBSERVADOR_NULO,
+                              ContadorEventos, Observador, Observadores,
+                              RegistradorEventos, fase)
+from vigenere_idiomas import (TabelaLimpeza, carregar_todos,
+                              idiomas_disponiveis, obter_idioma)
+
+IDIOMA_PADRAO = 'ingles'
+TAMANHO_BLOCO_LIMPEZA = 1 << 20
+
+ResultadoAtaque = collections.namedtuple('ResultadoAtaque', [
+    'idioma', 'tamanho_chave', 'chave', 'pontuacao', 'texto_plano'])
+DETECCAO_AUTOMATICA = 'auto'
+NUM_TAMANHOS_PADRAO = 3
+LARGURA_FEIXE_PADRAO = 100
+NUM_CANDIDATOS_PADRAO = 10
+
+CandidatoChave = collections.namedtuple('CandidatoChave', [
+    'tamanho_chave', 'chave', 'pontuacao'])
+
+
+@functools.lru_cache(maxsize=None)
+def _tabela_combinada(nomes):
+    substituicoes = {}
+    for nome in nomes:
+        substituicoes.update(obter_idioma(nome).substituicoes)
+    return TabelaLimpeza(substituicoes)
+
+
+def _tabela_limpeza(idioma):
+    if idioma == DETECCAO_AUTOMATICA:
+        return _tabela_combinada(tuple(idiomas_disponiveis()))
+    return obter_idioma(idioma).tabela_normalizacao
+
+
+def limpar_texto(texto, idioma=IDIOMA_PADRAO):
+    return _tabela_limpeza(idioma).limpar(texto)
+
+
+def limpar_blocos(blocos, idioma=IDIOMA_PADRAO):
+    # Cada caractere é limpo isoladamente, então blocos de qualquer tamanho
+    # produzem o mesmo resultado que o texto inteiro.
+    tabela = _tabela_limpeza(idioma)
+    for bloco in blocos:
+        yield tabela.limpar(bloco)
+
+
+def limpar_arquivo(caminho, idioma=IDIOMA_PADRAO,
+                   tamanho_bloco=TAMANHO_BLOCO_LIMPEZA):
+    with open(caminho, encoding='utf-8', errors='replace') as arquivo:
+        blocos = iter(lambda: arquivo.read(tamanho_bloco), '')
+        yield from limpar_blocos(blocos, idioma)
+
+
+def calcular_ic(texto):
+    n = len(texto)
+    if n < 2:
+        return 0.0
+
+    contagens_freq = collections.Counter(texto)
+    soma_ic = sum(contagem * (contagem - 1)
+                  for contagem in contagens_freq.values())
+    ic = soma_ic / (n * (n - 1))
+    return ic
+
+
+def encontrar_tamanho_chave(texto_cifrado, max_tam_chave=20, metodo='ic',
+                            idioma=IDIOMA_PADRAO):
+    return analise.encontrar_tamanho_chave(
+        texto_cifrado, obter_idioma(idioma).ic, max_tam_chave, metodo)
+
+
+def obter_colunas(texto_cifrado, tamanho_chave):
+    return [texto_cifrado[i::tamanho_chave] for i in range(tamanho_chave)]
+
+
+def calcular_qui_quadrado(texto, idioma=IDIOMA_PADRAO):
+    contagens = analise.contar_letras(analise.codificar(texto))
+    return analise.pontuar_deslocamentos(
+        contagens, obter_idioma(idioma).frequencias)[0]
+
+
+def pontuacoes_letras_chave_coluna(texto_coluna, idioma=IDIOMA_PADRAO):
+    return analise.pontuar_coluna(texto_coluna,
+                                  obter_idioma(idioma).frequencias)
+
+
+def encontrar_letra_chave_coluna(texto_coluna, idioma=IDIOMA_PADRAO):
+    return pontuacoes_letras_chave_coluna(texto_coluna, idioma)[0][0]
+
+
+def decifrar_vigenere(texto_cifrado, chave):
+    return descriptografar(texto_cifrado, chave.upper())
+
+
+def detectar_idioma(texto_cifrado, max_tam_chave=20):
+    # Uma passada compartilhada: os ICs por tamanho e os histogramas das
+    # colunas não dependem do idioma; só a escolha do tamanho e a pontuação
+    # qui-quadrado usam os vetores de cada modelo.
+    modelos = carregar_todos()
+    dados = analise.codificar(limpar_texto(texto_cifrado, DETECCAO_AUTOMATICA))
+    if not dados:
+        return []
+
+    ics = analise.ics_por_tamanho(dados, max_tam_chave)
+    contagens_por_tamanho = {}
+    pontuacoes = []
+    for modelo in modelos:
+        tam_chave = analise.escolher_tamanho_chave(ics, modelo.ic)
+        if tam_chave not in contagens_por_tamanho:
+            contagens_por_tamanho[tam_chave] = analise.contagens_colunas(
+                dados, tam_chave)
+        qui_quadrado_total = sum(
+            min(analise.pontuar_deslocamentos(contagens, modelo.frequencias))
+            for contagens in contagens_por_tamanho[tam_chave] if sum(contagens))
+        pontuacoes.append((modelo.nome, qui_quadrado_total / len(dados)))
+    return sorted(pontuacoes, key=lambda item: item[1])
+
+
+def estimar_chave(colunas, idioma=IDIOMA_PADRAO, observador=OBSERVADOR_NULO):
+    # Melhor letra de cada coluna; devolve (chave, qui-quadrado total).
+    chave_estimada = ""
+    qui_quadrado_total = 0.0
+    for i, texto_coluna in enumerate(colunas):
+        with fase(observador, FASE_COLUNA, len(texto_coluna)) as dados:
+            dados['coluna'] = i
+            if not texto_coluna:
+                dados['letra'] = None
+                continue
+            letra_chave, qui_quadrado = pontuacoes_letras_chave_coluna(
+                texto_coluna, idioma)[0]
+            dados['letra'] = letra_chave
+            dados['qui_quadrado'] = qui_quadrado
+        chave_estimada += letra_chave
+        qui_quadrado_total += qui_quadrado
+    return chave_estimada, qui_quadrado_total
+
+
+def _executar_ataque(texto_cifrado, max_tam_chave, metodo_tamanho, idioma,
+                     observador):
+    # Núcleo comum de atacar e ataque_frequencia_vigenere: cada fase emite um
+    # Evento com tempo, tamanho da entrada e resultados intermediários.
+    if idioma == DETECCAO_AUTOMATICA:
+        with fase(observador, FASE_DETECCAO_IDIOMA, len(texto_cifrado)) as dados:
+            idiomas_ranqueados = detectar_idioma(texto_cifrado, max_tam_chave)
+            dados['ranking'] = idiomas_ranqueados
+        if not idiomas_ranqueados:
+            return ResultadoAtaque(None, 0, "", None, "")
+        idioma = idiomas_ranqueados[0][0]
+    modelo = obter_idioma(idioma)
+
+    with fase(observador, FASE_LIMPEZA, len(texto_cifrado)) as dados:
+        texto_cifrado_limpo = limpar_texto(texto_cifrado, modelo)
+        dados['texto_limpo'] = texto_cifrado_limpo
+    if not texto_cifrado_limpo:
+        return ResultadoAtaque(modelo.nome, 0, "", None, "")
+
+    with fase(observador, FASE_TAMANHO_CHAVE, len(texto_cifrado_limpo)) as dados:
+        tam_chave_estimado = encontrar_tamanho_chave(
+            texto_cifrado_limpo, max_tam_chave, metodo_tamanho, modelo)
+        dados['metodo'] = metodo_tamanho
+        dados['tamanho_chave'] = tam_chave_estimado
+    if tam_chave_estimado == 0:
+        return ResultadoAtaque(modelo.nome, 0, "", None, "")
+
+    with fase(observador, FASE_COLUNAS, len(texto_cifrado_limpo)) as dados:
+        colunas = obter_colunas(texto_cifrado_limpo, tam_chave_estimado)
+        dados['num_colunas'] = len(colunas)
+    chave_estimada, qui_quadrado_total = estimar_chave(
+        colunas, modelo, observador)
+    if not chave_estimada:
+        return ResultadoAtaque(modelo.nome, tam_chave_estimado, "", None, "")
+
+    with fase(observador, FASE_DECIFRAGEM, len(texto_cifrado_limpo)) as dados:
+        texto_plano = decifrar_vigenere(texto_cifrado_limpo, chave_estimada)
+        dados['chave'] = chave_estimada
+        dados['texto_plano'] = texto_plano
+    return ResultadoAtaque(
+        modelo.nome, tam_chave_estimado, chave_estimada,
+        qui_quadrado_total / len(texto_cifrado_limpo), texto_plano)
+
+
+def atacar(texto_cifrado, max_tam_chave=20, metodo_tamanho='ic',
+           idioma=IDIOMA_PADRAO, observador=OBSERVADOR_NULO):
+    # Mesmo ataque de ataque_frequencia_vigenere, sem saída no console; a
+    # pontuação é o qui-quadrado médio por letra (menor é melhor).
+    return _executar_ataque(texto_cifrado, max_tam_chave, metodo_tamanho,
+                            idioma, observador)
+
+
+class _ImpressoraConsole(Observador):
+    # Reproduz a saída passo a passo de ataque_frequencia_vigenere a partir
+    # dos eventos; as prévias só são fatiadas aqui. Fases que falharam não
+    # imprimem nada e a exceção chega ao chamador.
+    def fim(self, evento):
+        if evento.erro is not None:
+            return
+        dados = evento.dados
+        if evento.fase == FASE_DETECCAO_IDIOMA:
+            if dados.get('ranking'):
+                print(f"Idioma Detectado: {dados['ranking'][0][0]}")
+            else:
+                print("O texto cifrado está vazio após a limpeza.")
+        elif evento.fase == FASE_LIMPEZA:
+            if dados.get('texto_limpo'):
+                print(
+                    f"Texto Cifrado Limpo (primeiros 100 caracteres): {dados['texto_limpo'][:100]}...")
+            else:
+                print("O texto cifrado está vazio após a limpeza.")
+        elif evento.fase == FASE_TAMANHO_CHAVE:
+            print(f"\n[Passo 1] Tamanho da Chave Estimado: {dados.get('tamanho_chave', 0)}")
+            if not dados.get('tamanho_chave'):
+                print("Não foi possível determinar um tamanho de chave válido.")
+        elif evento.fase == FASE_COLUNAS:
+            print(f"[Passo 2] Texto cifrado dividido em {dados.get('num_colunas', 0)} colunas.")
+            print("\n[Passo 3] Encontrando letras da chave para cada coluna:")
+        elif evento.fase == FASE_COLUNA:
+            if dados.get('letra') is None:
+                print(
+                    f"   Coluna {dados.get('coluna', 0)+1} está vazia. Não é possível determinar a letra da chave.")
+            else:
+                print(f"   Coluna {dados['coluna']+1}: Letra da chave mais provável = {dados['letra']}")
+        elif evento.fase == FASE_DECIFRAGEM:
+            print(f"Chave Estimada Completa: {dados.get('chave', '')}")
+            print("\n[Passo 4] Decifrando com a chave estimada...")
+            print(
+                f"Texto Plano Decifrado (primeiros 200 caracteres): {dados.get('texto_plano', '')[:200]}...")
+
+
+def _busca_feixe(rankings, largura_feixe, prazo):
+    # As pontuações das colunas são independentes e se somam, então cada
+    # prefixo da chave carrega sua soma parcial e estender um prefixo custa
+    # uma adição. Se o prazo esgotar, os prefixos restantes são completados
+    # com a melhor letra de cada coluna.
+    feixe = [(0.0, "")]
+    for posicao, ranking in enumerate(rankings):
+        if prazo is not None and time.perf_counter() > prazo:
+            sufixo = "".join(letras[0][0] for letras in rankings[posicao:])
+            resto = sum(letras[0][1] for letras in rankings[posicao:])
+            return [(pontuacao + resto, prefixo + sufixo)
+                    for pontuacao, prefixo in feixe]
+        extensoes = ((pontuacao + pontuacao_letra, prefixo + letra)
+                     for pontuacao, prefixo in feixe
+                     for letra, pontuacao_letra in ranking[:largura_feixe])
+        feixe = heapq.nsmallest(largura_feixe, extensoes)
+    return feixe
+
+
+def candidatos_chave(texto_cifrado, max_tam_chave=20, idioma=IDIOMA_PADRAO,
+                     num_tamanhos=NUM_TAMANHOS_PADRAO,
+                     largura_feixe=LARGURA_FEIXE_PADRAO,
+                     num_candidatos=NUM_CANDIDATOS_PADRAO, tempo_limite=None):
+    # Lista ranqueada de CandidatoChave em vez de um único palpite: os
+    # num_tamanhos tamanhos com IC mais próximo do idioma, e para cada um as
+    # chaves de uma busca em feixe sobre o ranking qui-quadrado das colunas.
+    # A pontuação é o qui-quadrado médio por letra, como em atacar.
+    prazo = None if tempo_limite is None else time.perf_counter() + tempo_limite
+    if idioma == DETECCAO_AUTOMATICA:
+        idiomas_ranqueados = detectar_idioma(texto_cifrado, max_tam_chave)
+        if not idiomas_ranqueados:
+            return []
+        idioma = idiomas_ranqueados[0][0]
+    modelo = obter_idioma(idioma)
+    texto_cifrado_limpo = limpar_texto(texto_cifrado, modelo)
+    if not texto_cifrado_limpo:
+        return []
+
+    dados = analise.codificar(texto_cifrado_limpo)
+    ics = analise.ics_por_tamanho(dados, max_tam_chave)
+    tamanhos = sorted(ics, key=lambda tam_chave: abs(ics[tam_chave] - modelo.ic))
+    melhores = {}
+    for tam_chave in tamanhos[:num_tamanhos]:
+        rankings = [
+            analise.ranquear_deslocamentos(
+                analise.pontuar_deslocamentos(contagens, modelo.frequencias))
+            for contagens in analise.contagens_colunas(dados, tam_chave)]
+        for pontuacao, chave in _busca_feixe(rankings, largura_feixe, prazo):
+            # Uma chave periódica (ABCABC) é a mesma cifra que a chave menor.
+            chave = analise.menor_periodo(chave)
+            pontuacao /= len(dados)
+            if chave not in melhores or pontuacao < melhores[chave].pontuacao:
+                melhores[chave] = CandidatoChave(len(chave), chave, pontuacao)
+        if prazo is not None and time.perf_counter() > prazo:
+            break
+    return sorted(melhores.values(),
+                  key=lambda candidato: (candidato.pontuacao, candidato.chave)
+                  )[:num_candidatos]
+
+
+def _ataque_adaptativo(texto_cifrado, max_tam_chave, metodo_tamanho, idioma,
+                       silencioso, observador):
+    # Importação local: vigenere_incremental depende deste módulo.
+    from vigenere_incremental import atacar_adaptativo
+
+    resultado = atacar_adaptativo(texto_cifrado, max_tam_chave, idioma,
+                                  metodo_tamanho=metodo_tamanho,
+                                  observador=observador)
+    if silencioso:
+        return resultado.chave, resultado.texto_plano
+    porcentagem = (100 * resultado.caracteres_lidos / resultado.caracteres_totais
+                   if resultado.caracteres_totais else 0.0)
+    print(f"[Modo Adaptativo] Lidos {resultado.caracteres_lidos} de "
+          f"{resultado.caracteres_totais} caracteres ({porcentagem:.1f}%).")
+    if not resultado.chave:
+        print("Não foi possível determinar nenhuma letra da chave.")
+        return "", ""
+    print(f"Idioma: {resultado.idioma}")
+    print(f"Tamanho da Chave Estimado: {resultado.tamanho_chave}")
+    print(f"Chave Estimada Completa: {resultado.chave} "
+          f"(confiança {resultado.confianca:.2f})")
+    print(
+        f"Texto Plano Decifrado (primeiros 200 caracteres): {resultado.texto_plano[:200]}...")
+    return resultado.chave, resultado.texto_plano
+
+
+def ataque_frequencia_vigenere(texto_cifrado, max_tam_chave=20,
+                               metodo_tamanho='ic', idioma=IDIOMA_PADRAO,
+                               adaptativo=False, silencioso=False,
+                               observador=OBSERVADOR_NULO):
+    # silencioso=True suprime toda a saída no console; observador recebe os
+    # eventos de cada fase (veja vigenere_eventos).
+    if not silencioso:
+        print("Iniciando Ataque de Análise de Frequência Vigenère...")
+
+    if adaptativo:
+        return _ataque_adaptativo(texto_cifrado, max_tam_chave,
+                                  metodo_tamanho, idioma, silencioso,
+                                  observador)
+
+    if not silencioso:
+        observador = Observadores(_ImpressoraConsole(), observador)
+    resultado = _executar_ataque(texto_cifrado, max_tam_chave, metodo_tamanho,
+                                 idioma, observador)
+    if resultado.tamanho_chave and not resultado.chave and not silencioso:
+        print("Não foi possível determinar nenhuma letra da chave.")
+    return resultado.chave, resultado.texto_plano
+
+
+def main(argv=None):
+    import argparse
+    import logging
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Ataque de análise de frequência à cifra de Vigenère.")
+    parser.add_argument('entrada', nargs='?', default='-',
+                        help="Arquivo com o texto cifrado ('-' para stdin).")
+    parser.add_argument('-i', '--idioma', default=IDIOMA_PADRAO,
+                        help="Nome do idioma registrado ou 'auto'.")
+    parser.add_argument('-t', '--max-tam-chave', type=int, default=20)
+    parser.add_argument('-m', '--metodo', choices=analise.METODOS_TAMANHO,
+                        default='ic')
+    parser.add_argument('-a', '--adaptativo', action='store_true',
+                        help="Lê apenas prefixos crescentes até a chave "
+                             "se estabilizar.")
+    parser.add_argument('-s', '--silencioso', action='store_true',
+                        help="Não mostra os passos do ataque.")
+    parser.add_argument('-l', '--log', action='store_true',
+                        help="Registra os eventos de cada fase no log.")
+    parser.add_argument('--perfil', action='store_true',
+                        help="Mostra tempo por fase e o perfil do cProfile.")
+    parser.add_argument('-n', '--candidatos', type=int, default=0,
+                        help="Lista as N melhores chaves da busca em feixe.")
+    parser.add_argument('-f', '--largura-feixe', type=int,
+                        default=LARGURA_FEIXE_PADRAO)
+    args = parser.parse_args(argv)
+
+    if args.entrada == '-':
+        texto_cifrado = sys.stdin.read()
+    else:
+        with open(args.entrada, encoding='utf-8') as arquivo:
+            texto_cifrado = arquivo.read()
+    observadores = []
+    if args.log:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        observadores.append(RegistradorEventos())
+    contador = ContadorEventos(perfil=True) if args.perfil else None
+    if contador is not None:
+        observadores.append(contador)
+    chave, _ = ataque_frequencia_vigenere(
+        texto_cifrado, args.max_tam_chave, args.metodo, args.idioma,
+        args.adaptativo, args.silencioso, Observadores(*observadores))
+    print(f"Chave Estimada Final: {chave}")
+    if contador is not None:
+        print(f"\n{contador.relatorio()}")
+
+    if args.candidatos:
+        print(f"\nMelhores {args.candidatos} candidatos:")
+        for candidato in candidatos_chave(
+                texto_cifrado, args.max_tam_chave, args.idioma,
+                largura_feixe=args.largura_feixe,
+                num_candidatos=args.candidatos):
+            print(f"   {candidato.chave} (tamanho {candidato.tamanho_chave}, "
+                  f"pontuação {candidato.pontuacao:.4f})")
+
+
+if __name__ == "__main__":
+    main()
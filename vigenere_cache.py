@@ -0,0 +1,163 @@
+import collections
+import hashlib
+import json
+import sqlite3
+
+import vigenere_analise as analise
+from vigenere_ataque import (DETECCAO_AUTOMATICA, IDIOMA_PADRAO,
+                             ResultadoAtaque, decifrar_vigenere,
+                             detectar_idioma, encontrar_tamanho_chave,
+                             estimar_chave, limpar_texto, obter_colunas)
+from vigenere_idiomas import obter_idioma
+
+MAX_ITENS_PADRAO = 4096
+MAX_BYTES_PADRAO = 64 << 20
+
+
+def _resumo(*partes):
+    return hashlib.sha256('\x00'.join(map(str, partes)).encode('utf-8')).hexdigest()
+
+
+def identificador_modelo(modelo):
+    # O nome sozinho não basta: se o arquivo de dados mudar, os resultados
+    # guardados deixam de valer.
+    return _resumo(modelo.nome, modelo.frequencias, modelo.ic)[:16]
+
+
+class ArmazemLRU:
+    # LRU em memória limitada por número de itens e por bytes (tamanho do
+    # valor serializado), com um SQLite local opcional como segundo nível.
+    def __init__(self, max_itens=MAX_ITENS_PADRAO, max_bytes=MAX_BYTES_PADRAO,
+                 caminho=None):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.itens = collections.OrderedDict()
+        self.bytes_usados = 0
+        self.estatisticas = collections.Counter()
+        self.conexao = None
+        if caminho is not None:
+            self.conexao = sqlite3.connect(caminho, timeout=30)
+            self.conexao.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(chave TEXT PRIMARY KEY, valor TEXT NOT NULL)')
+            self.conexao.commit()
+
+    def _guardar_memoria(self, chave, serializado):
+        if chave in self.itens:
+            self.bytes_usados -= len(self.itens.pop(chave))
+        if len(serializado) > self.max_bytes:
+            return
+        self.itens[chave] = serializado
+        self.bytes_usados += len(serializado)
+        while (len(self.itens) > self.max_itens
+               or self.bytes_usados > self.max_bytes):
+            _, removido = self.itens.popitem(last=False)
+            self.bytes_usados -= len(removido)
+            self.estatisticas['remocoes'] += 1
+
+    def obter(self, chave):
+        serializado = self.itens.get(chave)
+        if serializado is not None:
+            self.itens.move_to_end(chave)
+            self.estatisticas['acertos_memoria'] += 1
+            return json.loads(serializado)
+        if self.conexao is not None:
+            linha = self.conexao.execute(
+                'SELECT valor FROM cache WHERE chave = ?', (chave,)).fetchone()
+            if linha is not None:
+                self.estatisticas['acertos_disco'] += 1
+                self._guardar_memoria(chave, linha[0])
+                return json.loads(linha[0])
+        self.estatisticas['falhas'] += 1
+        return None
+
+    def guardar(self, chave, valor):
+        serializado = json.dumps(valor)
+        self._guardar_memoria(chave, serializado)
+        if self.conexao is not None:
+            self.conexao.execute(
+                'INSERT OR REPLACE INTO cache (chave, valor) VALUES (?, ?)',
+                (chave, serializado))
+            self.conexao.commit()
+
+    def fechar(self):
+        if self.conexao is not None:
+            self.conexao.close()
+            self.conexao = None
+
+
+class CacheAtaque:
+    # Cache do pipeline de ataque endereçado pelo conteúdo do texto limpo.
+    # Guarda resultados parciais em dois níveis:
+    #   - ICs por tamanho de chave (independem do idioma): uma execução com
+    #     max_tam_chave=20 calcula apenas os tamanhos que faltam depois de
+    #     uma com max_tam_chave=10;
+    #   - chave e qui-quadrado por (texto, modelo, tamanho).
+    # O texto plano não é guardado; ele é refeito a partir da chave.
+    def __init__(self, max_itens=MAX_ITENS_PADRAO, max_bytes=MAX_BYTES_PADRAO,
+                 caminho=None):
+        self.armazem = ArmazemLRU(max_itens, max_bytes, caminho)
+
+    @property
+    def estatisticas(self):
+        return self.armazem.estatisticas
+
+    def fechar(self):
+        self.armazem.fechar()
+
+    def ics(self, texto_limpo, max_tam_chave=20, resumo_texto=None):
+        resumo_texto = resumo_texto or _resumo(texto_limpo)
+        chave = _resumo('ics', resumo_texto)
+        guardado = self.armazem.obter(chave) or {'max': 0, 'ics': []}
+        ics = {tam_chave: ic for tam_chave, ic in guardado['ics']}
+        if guardado['max'] == 0:
+            ics = analise.ics_por_tamanho(texto_limpo, max_tam_chave)
+        elif guardado['max'] < max_tam_chave:
+            ics.update(analise.ics_tamanhos(
+                texto_limpo, range(guardado['max'] + 1, max_tam_chave + 1)))
+        if guardado['max'] < max_tam_chave:
+            self.armazem.guardar(chave, {
+                'max': max_tam_chave, 'ics': sorted(ics.items())})
+        return {tam_chave: ic for tam_chave, ic in sorted(ics.items())
+                if tam_chave <= max_tam_chave}
+
+    def _chave_colunas(self, texto_limpo, tam_chave, modelo, resumo_texto):
+        chave = _resumo('colunas', resumo_texto, identificador_modelo(modelo),
+                        tam_chave)
+        guardado = self.armazem.obter(chave)
+        if guardado is None:
+            guardado = estimar_chave(
+                obter_colunas(texto_limpo, tam_chave), modelo)
+            self.armazem.guardar(chave, guardado)
+        return tuple(guardado)
+
+    def atacar(self, texto_cifrado, max_tam_chave=20, metodo_tamanho='ic',
+               idioma=IDIOMA_PADRAO):
+        if idioma == DETECCAO_AUTOMATICA:
+            idiomas_ranqueados = detectar_idioma(texto_cifrado, max_tam_chave)
+            if not idiomas_ranqueados:
+                return ResultadoAtaque(None, 0, "", None, "")
+            idioma = idiomas_ranqueados[0][0]
+        modelo = obter_idioma(idioma)
+
+        texto_cifrado_limpo = limpar_texto(texto_cifrado, modelo)
+        if not texto_cifrado_limpo:
+            return ResultadoAtaque(modelo.nome, 0, "", None, "")
+        resumo_texto = _resumo(texto_cifrado_limpo)
+
+        if metodo_tamanho == 'ic':
+            tam_chave_estimado = analise.escolher_tamanho_chave(
+                self.ics(texto_cifrado_limpo, max_tam_chave, resumo_texto),
+                modelo.ic)
+        else:
+            tam_chave_estimado = encontrar_tamanho_chave(
+                texto_cifrado_limpo, max_tam_chave, metodo_tamanho, modelo)
+
+        chave_estimada, qui_quadrado_total = self._chave_colunas(
+            texto_cifrado_limpo, tam_chave_estimado, modelo, resumo_texto)
+        if not chave_estimada:
+            return ResultadoAtaque(modelo.nome, tam_chave_estimado, "", None, "")
+        return ResultadoAtaque(
+            modelo.nome, tam_chave_estimado, chave_estimada,
+            qui_quadrado_total / len(texto_cifrado_limpo),
+            decifrar_vigenere(texto_cifrado_limpo, chave_estimada))
@@ -1,3 +1,34 @@
+import argparse
+import codecs
+import collections
+import concurrent.futures
+import functools
+import itertools
+import mmap
+import os
+import sys
+import time
+
+MOTORES = ('tabela', 'caractere')
+MOTOR_PADRAO = 'tabela'
+TAMANHO_BLOCO_PADRAO = 1 << 20
+TAMANHO_TRECHO_PARALELO = 16 << 20
+TAMANHO_PAGINA_MMAP = 4 << 20
+REGISTROS_POR_LOTE = 1 << 16
+TABELAS_EM_CACHE = 1024
+
+_INDICE_LETRA = bytes((codigo - ord('A')) if 'A' <= chr(codigo) <= 'Z' else
+                      (codigo - ord('a')) if 'a' <= chr(codigo) <= 'z' else 0
+                      for codigo in range(256))
+_MASCARA_MAIUSCULA = bytes(0xFF if 'A' <= chr(codigo) <= 'Z' else 0
+                           for codigo in range(256))
+_MASCARA_MINUSCULA = bytes(0xFF if 'a' <= chr(codigo) <= 'z' else 0
+                           for codigo in range(256))
+_BASE_OU_ORIGINAL = bytes(ord('A') if 'A' <= chr(codigo) <= 'Z' else
+                          ord('a') if 'a' <= chr(codigo) <= 'z' else codigo
+                          for codigo in range(256))
+
+
 def gerar_chave(mensagem, chave):
     chave = list(chave)
     if len(mensagem) == len(chave):
@@ -8,41 +39,469 @@ def gerar_chave(mensagem, chave):
     return "".join(chave)
 
 
-def criptografar(mensagem, chave):
+class _TabelaDeslocamento(dict):
+    # Mapeamento para str.translate que aplica a mesma aritmética do motor
+    # caractere a caractere. Só a faixa Latin-1 é memorizada; os demais
+    # códigos são calculados a cada vez para a tabela não crescer com o texto.
+    def __init__(self, deslocamento_maiuscula, deslocamento_minuscula):
+        super().__init__()
+        self.deslocamento_maiuscula = deslocamento_maiuscula
+        self.deslocamento_minuscula = deslocamento_minuscula
+
+    def __missing__(self, codigo):
+        caractere = chr(codigo)
+        if caractere.isupper():
+            resultado = (codigo - ord('A') +
+                         self.deslocamento_maiuscula) % 26 + ord('A')
+        elif caractere.islower():
+            resultado = (codigo - ord('a') +
+                         self.deslocamento_minuscula) % 26 + ord('a')
+        else:
+            resultado = codigo
+        if codigo < 256:
+            self[codigo] = resultado
+        return resultado
+
+
+@functools.lru_cache(maxsize=TABELAS_EM_CACHE)
+def _tabela_texto(caractere_chave, sentido):
+    codigo_chave = ord(caractere_chave)
+    return _TabelaDeslocamento(sentido * (codigo_chave - ord('A')),
+                               sentido * (codigo_chave - ord('a')))
+
+
+@functools.lru_cache(maxsize=TABELAS_EM_CACHE)
+def _tabela_bytes(caractere_chave, sentido):
+    tabela = _tabela_texto(caractere_chave, sentido)
+    return bytes(tabela[codigo] for codigo in range(128)) + bytes(range(128, 256))
+
+
+def _tabelas_periodo(chave, sentido, fase, construtor):
+    # Uma tabela por posição da chave, já rotacionada pela fase: o estado da
+    # chave tem o tamanho do período, não o tamanho da mensagem.
+    tam_chave = len(chave)
+    return [construtor(chave[(fase + i) % tam_chave], sentido)
+            for i in range(tam_chave)]
+
+
+def _transformar_buffer(buffer, inicio, fim, tabelas):
+    # Transforma buffer[inicio:fim] no lugar; funciona com bytearray e mmap.
+    tam_chave = len(tabelas)
+    for i in range(min(tam_chave, fim - inicio)):
+        buffer[inicio + i:fim:tam_chave] = (
+            buffer[inicio + i:fim:tam_chave].translate(tabelas[i]))
+
+
+def _transformar_tabela(mensagem, chave, sentido, fase=0):
+    tam_chave = len(chave)
+    posicoes = min(tam_chave, len(mensagem))
+    if mensagem.isascii():
+        buffer = bytearray(mensagem, 'ascii')
+        _transformar_buffer(buffer, 0, len(buffer),
+                            _tabelas_periodo(chave, sentido, fase, _tabela_bytes))
+        return buffer.decode('ascii')
+
+    tabelas = _tabelas_periodo(chave, sentido, fase, _tabela_texto)
+    caracteres = list(mensagem)
+    for i in range(posicoes):
+        caracteres[i::tam_chave] = mensagem[i::tam_chave].translate(tabelas[i])
+    return "".join(caracteres)
+
+
+def _criptografar_caractere(mensagem, chave):
     texto_criptografado = []
-    chave = gerar_chave(mensagem, chave)
+    tam_chave = len(chave)
     for i in range(len(mensagem)):
         caractere = mensagem[i]
+        caractere_chave = chave[i % tam_chave]
         if caractere.isupper():
             caractere_criptografado = chr(
-                (ord(caractere) + ord(chave[i]) - 2 * ord('A')) % 26 + ord('A'))
+                (ord(caractere) + ord(caractere_chave) - 2 * ord('A')) % 26 + ord('A'))
         elif caractere.islower():
             caractere_criptografado = chr(
-                (ord(caractere) + ord(chave[i]) - 2 * ord('a')) % 26 + ord('a'))
+                (ord(caractere) + ord(caractere_chave) - 2 * ord('a')) % 26 + ord('a'))
         else:
             caractere_criptografado = caractere
         texto_criptografado.append(caractere_criptografado)
     return "".join(texto_criptografado)
 
 
-def descriptografar(mensagem, chave):
+def _descriptografar_caractere(mensagem, chave):
     texto_descriptografado = []
-    chave = gerar_chave(mensagem, chave)
+    tam_chave = len(chave)
     for i in range(len(mensagem)):
         caractere = mensagem[i]
+        caractere_chave = chave[i % tam_chave]
         if caractere.isupper():
             caractere_descriptografado = chr(
-                (ord(caractere) - ord(chave[i]) + 26) % 26 + ord('A'))
+                (ord(caractere) - ord(caractere_chave) + 26) % 26 + ord('A'))
         elif caractere.islower():
             caractere_descriptografado = chr(
-                (ord(caractere) - ord(chave[i]) + 26) % 26 + ord('a'))
+                (ord(caractere) - ord(caractere_chave) + 26) % 26 + ord('a'))
         else:
             caractere_descriptografado = caractere
         texto_descriptografado.append(caractere_descriptografado)
     return "".join(texto_descriptografado)
 
 
-def main():
+def _validar_motor(motor):
+    if motor not in MOTORES:
+        raise ValueError(
+            f"Motor desconhecido: {motor!r}. Use um de: {', '.join(MOTORES)}.")
+
+
+def _validar_chave(chave):
+    if not chave:
+        raise ValueError("A chave não pode ser vazia.")
+
+
+# fase: posição da chave no primeiro caractere, para transformar um trecho
+# que começa no meio de uma mensagem maior.
+def criptografar(mensagem, chave, motor=MOTOR_PADRAO, fase=0):
+    _validar_motor(motor)
+    _validar_chave(chave)
+    if motor == 'caractere':
+        fase %= len(chave)
+        return _criptografar_caractere(mensagem, chave[fase:] + chave[:fase])
+    return _transformar_tabela(mensagem, chave, 1, fase)
+
+
+def descriptografar(mensagem, chave, motor=MOTOR_PADRAO, fase=0):
+    _validar_motor(motor)
+    _validar_chave(chave)
+    if motor == 'caractere':
+        fase %= len(chave)
+        return _descriptografar_caractere(mensagem, chave[fase:] + chave[:fase])
+    return _transformar_tabela(mensagem, chave, -1, fase)
+
+
+@functools.lru_cache(maxsize=None)
+def _tabelas_deslocamento_lote(sentido):
+    # Byte da chave -> deslocamento em 0..25 para maiúsculas e minúsculas,
+    # já com o sinal do sentido aplicado.
+    return (bytes((sentido * (codigo - ord('A'))) % 26 for codigo in range(256)),
+            bytes((sentido * (codigo - ord('a'))) % 26 for codigo in range(256)))
+
+
+def _raias(valor, tamanho):
+    return int.from_bytes(bytes([valor]) * tamanho, 'big')
+
+
+def _transformar_registros_ascii(mensagens, fluxo_chave, sentido):
+    # Aritmética em raias de 8 bits sobre inteiros grandes: cada byte da
+    # mensagem ocupa uma raia e as operações de int valem para todas de uma
+    # vez. Índice da letra (0..25) + deslocamento (0..25) nunca passa de 50,
+    # então não há vai-um entre raias; somar 102 liga o bit 7 exatamente nas
+    # raias >= 26, que perdem 26. Nas raias sem letra a soma é zero e o
+    # byte original volta pela tabela _BASE_OU_ORIGINAL.
+    tamanho = len(mensagens)
+    tabela_maiuscula, tabela_minuscula = _tabelas_deslocamento_lote(sentido)
+    maiusculas = int.from_bytes(mensagens.translate(_MASCARA_MAIUSCULA), 'big')
+    minusculas = int.from_bytes(mensagens.translate(_MASCARA_MINUSCULA), 'big')
+    deslocamentos = (
+        (int.from_bytes(fluxo_chave.translate(tabela_maiuscula), 'big') & maiusculas) |
+        (int.from_bytes(fluxo_chave.translate(tabela_minuscula), 'big') & minusculas))
+    soma = int.from_bytes(mensagens.translate(_INDICE_LETRA), 'big') + deslocamentos
+    soma -= 26 * (((soma + _raias(102, tamanho)) & _raias(0x80, tamanho)) >> 7)
+    resultado = soma + int.from_bytes(mensagens.translate(_BASE_OU_ORIGINAL), 'big')
+    return resultado.to_bytes(tamanho, 'big')
+
+
+def _transformar_registros(mensagens, chaves, sentido):
+    # Todos os registros ASCII: concatena as mensagens e as chaves de cada
+    # uma repetidas até o tamanho da mensagem, transforma tudo de uma vez e
+    # fatia o resultado de volta pelos tamanhos originais.
+    fluxo_chave = "".join([(chave * (len(mensagem) // len(chave) + 1))[:len(mensagem)]
+                           for mensagem, chave in zip(mensagens, chaves)])
+    texto = _transformar_registros_ascii(
+        "".join(mensagens).encode('ascii'), fluxo_chave.encode('ascii'),
+        sentido).decode('ascii')
+    limites = list(itertools.accumulate(map(len, mensagens), initial=0))
+    return [texto[inicio:fim] for inicio, fim in zip(limites, limites[1:])]
+
+
+def _transformar_lote(mensagens, chaves, sentido, registros_por_lote):
+    if isinstance(chaves, str):
+        chaves = [chaves] * len(mensagens)
+    if len(mensagens) != len(chaves):
+        raise ValueError("Mensagens e chaves devem ter o mesmo tamanho.")
+    if not all(chaves):
+        raise ValueError("A chave não pode ser vazia.")
+
+    resultados = []
+    for inicio in range(0, len(mensagens), registros_por_lote):
+        lote_mensagens = mensagens[inicio:inicio + registros_por_lote]
+        lote_chaves = chaves[inicio:inicio + registros_por_lote]
+        if "".join(lote_mensagens).isascii() and "".join(lote_chaves).isascii():
+            resultados.extend(_transformar_registros(
+                lote_mensagens, lote_chaves, sentido))
+            continue
+        # Lote com registros não ASCII: esses usam a função escalar e os
+        # demais ainda são transformados juntos, na mesma ordem.
+        registros_ascii = [mensagem.isascii() and chave.isascii()
+                           for mensagem, chave in zip(lote_mensagens, lote_chaves)]
+        transformados = iter(_transformar_registros(
+            [mensagem for mensagem, eh_ascii in zip(lote_mensagens, registros_ascii) if eh_ascii],
+            [chave for chave, eh_ascii in zip(lote_chaves, registros_ascii) if eh_ascii],
+            sentido))
+        resultados.extend(
+            next(transformados) if eh_ascii else
+            _transformar_tabela(mensagem, chave, sentido)
+            for mensagem, chave, eh_ascii in zip(lote_mensagens, lote_chaves, registros_ascii))
+    return resultados
+
+
+def criptografar_lote(mensagens, chaves, registros_por_lote=REGISTROS_POR_LOTE):
+    return _transformar_lote(mensagens, chaves, 1, registros_por_lote)
+
+
+def descriptografar_lote(mensagens, chaves, registros_por_lote=REGISTROS_POR_LOTE):
+    return _transformar_lote(mensagens, chaves, -1, registros_por_lote)
+
+
+def _transformar_fluxo(entrada, saida, chave, sentido, tamanho_bloco):
+    _validar_chave(chave)
+    # O decodificador incremental guarda os bytes de um caractere UTF-8
+    # cortado no fim do bloco até a leitura seguinte; bytes inválidos passam
+    # inalterados via surrogateescape.
+    decodificador = codecs.getincrementaldecoder('utf-8')('surrogateescape')
+    tam_chave = len(chave)
+    fase = 0
+    total_caracteres = 0
+    while True:
+        bloco = entrada.read(tamanho_bloco)
+        texto = decodificador.decode(bloco, final=not bloco)
+        if texto:
+            texto_transformado = _transformar_tabela(texto, chave, sentido, fase)
+            saida.write(texto_transformado.encode('utf-8', 'surrogateescape'))
+            fase = (fase + len(texto)) % tam_chave
+            total_caracteres += len(texto)
+        if not bloco:
+            break
+    saida.flush()
+    return total_caracteres
+
+
+def criptografar_fluxo(entrada, saida, chave,
+                       tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    return _transformar_fluxo(entrada, saida, chave, 1, tamanho_bloco)
+
+
+def descriptografar_fluxo(entrada, saida, chave,
+                          tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    return _transformar_fluxo(entrada, saida, chave, -1, tamanho_bloco)
+
+
+def _transformar_paralelo(mensagem, chave, sentido, trabalhadores, tamanho_trecho):
+    _validar_chave(chave)
+    tam_chave = len(chave)
+    inicios = range(0, len(mensagem), tamanho_trecho)
+    with concurrent.futures.ProcessPoolExecutor(trabalhadores) as executor:
+        # Cada caractere consome uma posição da chave, letra ou não, então a
+        # fase de um trecho é apenas o seu deslocamento módulo o tamanho da chave.
+        trechos = executor.map(
+            _transformar_tabela,
+            (mensagem[inicio:inicio + tamanho_trecho] for inicio in inicios),
+            [chave] * len(inicios), [sentido] * len(inicios),
+            (inicio % tam_chave for inicio in inicios))
+        return "".join(trechos)
+
+
+def criptografar_paralelo(mensagem, chave, trabalhadores=None,
+                          tamanho_trecho=TAMANHO_TRECHO_PARALELO):
+    return _transformar_paralelo(mensagem, chave, 1, trabalhadores,
+                                 tamanho_trecho)
+
+
+def descriptografar_paralelo(mensagem, chave, trabalhadores=None,
+                             tamanho_trecho=TAMANHO_TRECHO_PARALELO):
+    return _transformar_paralelo(mensagem, chave, -1, trabalhadores,
+                                 tamanho_trecho)
+
+
+def _ler_trecho(caminho, inicio, fim):
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        return arquivo.read(fim - inicio).decode('utf-8', 'surrogateescape')
+
+
+def _contar_caracteres_trecho(caminho, inicio, fim):
+    return len(_ler_trecho(caminho, inicio, fim))
+
+
+def _transformar_trecho(caminho, inicio, fim, chave, sentido, fase):
+    texto = _ler_trecho(caminho, inicio, fim)
+    return _transformar_tabela(texto, chave, sentido, fase).encode(
+        'utf-8', 'surrogateescape')
+
+
+def _limites_trechos(caminho, tamanho_trecho):
+    # Recua cada fronteira sobre bytes de continuação (10xxxxxx) para que
+    # nenhum caractere UTF-8 fique dividido entre dois trechos.
+    tamanho = os.path.getsize(caminho)
+    limites = [0]
+    with open(caminho, 'rb') as arquivo:
+        for posicao in range(tamanho_trecho, tamanho, tamanho_trecho):
+            arquivo.seek(posicao - 3)
+            vizinhanca = arquivo.read(4)
+            corte = 3
+            while corte > 0 and 0x80 <= vizinhanca[corte] < 0xC0:
+                corte -= 1
+            limite = posicao - 3 + corte
+            if limite > limites[-1]:
+                limites.append(limite)
+    if tamanho > 0:
+        limites.append(tamanho)
+    return list(zip(limites, limites[1:]))
+
+
+def _transformar_arquivo_paralelo(caminho_entrada, caminho_saida, chave, sentido,
+                                  trabalhadores, tamanho_trecho):
+    _validar_chave(chave)
+    tam_chave = len(chave)
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    trechos = _limites_trechos(caminho_entrada, max(tamanho_trecho, 4))
+    with concurrent.futures.ProcessPoolExecutor(trabalhadores) as executor:
+        contagens = executor.map(
+            _contar_caracteres_trecho,
+            [caminho_entrada] * len(trechos),
+            [inicio for inicio, _ in trechos],
+            [fim for _, fim in trechos])
+        fases = []
+        fase = 0
+        for contagem in contagens:
+            fases.append(fase)
+            fase = (fase + contagem) % tam_chave
+
+        # Janela limitada de trechos em andamento: a memória não cresce com o
+        # arquivo mesmo que a escrita fique para trás dos trabalhadores.
+        pendentes = collections.deque()
+        with open(caminho_saida, 'wb') as saida:
+            for (inicio, fim), fase in zip(trechos, fases):
+                pendentes.append(executor.submit(
+                    _transformar_trecho, caminho_entrada, inicio, fim,
+                    chave, sentido, fase))
+                if len(pendentes) >= 2 * trabalhadores:
+                    saida.write(pendentes.popleft().result())
+            while pendentes:
+                saida.write(pendentes.popleft().result())
+    return os.path.getsize(caminho_entrada)
+
+
+def criptografar_arquivo_paralelo(caminho_entrada, caminho_saida, chave,
+                                  trabalhadores=None,
+                                  tamanho_trecho=TAMANHO_TRECHO_PARALELO):
+    return _transformar_arquivo_paralelo(caminho_entrada, caminho_saida, chave,
+                                         1, trabalhadores, tamanho_trecho)
+
+
+def descriptografar_arquivo_paralelo(caminho_entrada, caminho_saida, chave,
+                                     trabalhadores=None,
+                                     tamanho_trecho=TAMANHO_TRECHO_PARALELO):
+    return _transformar_arquivo_paralelo(caminho_entrada, caminho_saida, chave,
+                                         -1, trabalhadores, tamanho_trecho)
+
+
+def _verificar_ascii_mmap(mapa, tamanho, tamanho_pagina):
+    # Varre o arquivo inteiro antes de escrever qualquer página, para que um
+    # erro nunca deixe o arquivo parcialmente transformado.
+    for inicio in range(0, tamanho, tamanho_pagina):
+        fim = min(inicio + tamanho_pagina, tamanho)
+        if not mapa[inicio:fim].isascii():
+            raise ValueError(
+                f"Byte não ASCII no trecho {inicio}-{fim}; o modo "
+                "mmap aceita apenas arquivos ASCII.")
+
+
+def _transformar_mmap(caminho_entrada, chave, sentido, caminho_saida,
+                      tamanho_pagina):
+    _validar_chave(chave)
+    if (caminho_saida is not None and os.path.exists(caminho_saida) and
+            os.path.samefile(caminho_entrada, caminho_saida)):
+        raise ValueError(
+            "A saída é o próprio arquivo de entrada; omita o caminho de "
+            "saída para transformar no lugar.")
+    tam_chave = len(chave)
+    tabelas = _tabelas_periodo(chave, sentido, 0, _tabela_bytes)
+    tamanho_pagina = max(tamanho_pagina, 1)
+    tamanho = os.path.getsize(caminho_entrada)
+    if tamanho == 0:
+        if caminho_saida is not None:
+            open(caminho_saida, 'wb').close()
+        return 0, 0.0
+
+    inicio_tempo = time.perf_counter()
+    with open(caminho_entrada, 'rb' if caminho_saida else 'r+b') as entrada:
+        entrada_mapeada = mmap.mmap(
+            entrada.fileno(), 0,
+            access=mmap.ACCESS_READ if caminho_saida else mmap.ACCESS_WRITE)
+        with entrada_mapeada:
+            _verificar_ascii_mmap(entrada_mapeada, tamanho, tamanho_pagina)
+            if caminho_saida is None:
+                saida_mapeada = entrada_mapeada
+                arquivo_saida = None
+            else:
+                arquivo_saida = open(caminho_saida, 'w+b')
+                arquivo_saida.truncate(tamanho)
+                saida_mapeada = mmap.mmap(arquivo_saida.fileno(), 0)
+            try:
+                for inicio in range(0, tamanho, tamanho_pagina):
+                    fim = min(inicio + tamanho_pagina, tamanho)
+                    if saida_mapeada is not entrada_mapeada:
+                        saida_mapeada[inicio:fim] = entrada_mapeada[inicio:fim]
+                    # Em ASCII cada byte é um caractere, então a fase da chave
+                    # no início da página é o próprio deslocamento em bytes.
+                    fase = inicio % tam_chave
+                    _transformar_buffer(saida_mapeada, inicio, fim,
+                                        tabelas[fase:] + tabelas[:fase])
+                saida_mapeada.flush()
+            finally:
+                if arquivo_saida is not None:
+                    saida_mapeada.close()
+                    arquivo_saida.close()
+    duracao = time.perf_counter() - inicio_tempo
+    return tamanho, tamanho / duracao if duracao else float('inf')
+
+
+def criptografar_mmap(caminho_entrada, chave, caminho_saida=None,
+                      tamanho_pagina=TAMANHO_PAGINA_MMAP):
+    return _transformar_mmap(caminho_entrada, chave, 1, caminho_saida,
+                             tamanho_pagina)
+
+
+def descriptografar_mmap(caminho_entrada, chave, caminho_saida=None,
+                         tamanho_pagina=TAMANHO_PAGINA_MMAP):
+    return _transformar_mmap(caminho_entrada, chave, -1, caminho_saida,
+                             tamanho_pagina)
+
+
+def _abrir(caminho, modo, padrao):
+    if caminho == '-':
+        return padrao
+    return open(caminho, modo)
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Cifra de Vigenère. Sem argumentos, abre o modo interativo.")
+    parser.add_argument('entrada', nargs='?', default='-',
+                        help="Arquivo de entrada ('-' para stdin).")
+    parser.add_argument('saida', nargs='?', default='-',
+                        help="Arquivo de saída ('-' para stdout).")
+    parser.add_argument('-c', '--chave', help="Chave (apenas letras).")
+    parser.add_argument('-d', '--descriptografar', action='store_true',
+                        help="Descriptografa em vez de criptografar.")
+    parser.add_argument('-b', '--bloco', type=int, default=TAMANHO_BLOCO_PADRAO,
+                        help="Tamanho do bloco de leitura em bytes.")
+    parser.add_argument('-p', '--processos', type=int,
+                        help="Processa o arquivo em paralelo com N processos.")
+    parser.add_argument('-m', '--mmap', action='store_true',
+                        help="Mapeia o arquivo ASCII em memória; sem arquivo "
+                             "de saída, transforma a entrada no lugar.")
+    return parser
+
+
+def modo_interativo():
     while True:
         print("\n--- Cifra de Vigenère ---")
         mensagem_original = input(
@@ -68,5 +527,58 @@ def main():
 
     print("Programa encerrado.")
 
+
+def main(argv=None):
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+
+    if args.chave is None:
+        if args.entrada != '-' or args.saida != '-':
+            parser.error("--chave é obrigatória ao processar arquivos.")
+        modo_interativo()
+        return
+
+    if not args.chave.isalpha():
+        parser.error("A chave não pode ser vazia e deve conter apenas letras.")
+    if args.bloco <= 0:
+        parser.error("O tamanho do bloco deve ser positivo.")
+
+    if args.mmap:
+        if args.entrada == '-':
+            parser.error("--mmap exige um arquivo de entrada.")
+        transformar_mmap = (descriptografar_mmap if args.descriptografar
+                            else criptografar_mmap)
+        total_bytes, bytes_por_segundo = transformar_mmap(
+            args.entrada, args.chave,
+            None if args.saida == '-' else args.saida)
+        print(f"{total_bytes} bytes processados "
+              f"({bytes_por_segundo / 1e6:.1f} MB/s).", file=sys.stderr)
+        return
+
+    if args.processos is not None:
+        if args.processos <= 0:
+            parser.error("O número de processos deve ser positivo.")
+        if args.entrada == '-' or args.saida == '-':
+            parser.error("--processos exige arquivos de entrada e saída.")
+        transformar_arquivo = (descriptografar_arquivo_paralelo
+                               if args.descriptografar
+                               else criptografar_arquivo_paralelo)
+        transformar_arquivo(args.entrada, args.saida, args.chave, args.processos)
+        return
+
+    transformar = descriptografar_fluxo if args.descriptografar else criptografar_fluxo
+    entrada = _abrir(args.entrada, 'rb', sys.stdin.buffer)
+    try:
+        saida = _abrir(args.saida, 'wb', sys.stdout.buffer)
+        try:
+            transformar(entrada, saida, args.chave, args.bloco)
+        finally:
+            if saida is not sys.stdout.buffer:
+                saida.close()
+    finally:
+        if entrada is not sys.stdin.buffer:
+            entrada.close()
+
+
 if __name__ == "__main__":
     main()
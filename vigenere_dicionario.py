@@ -0,0 +1,166 @@
+import argparse
+import collections
+import concurrent.futures
+import heapq
+import mmap
+import os
+import time
+
+import vigenere_analise as analise
+from vigenere_ataque import IDIOMA_PADRAO, decifrar_vigenere, limpar_texto
+from vigenere_idiomas import obter_idioma
+
+TAMANHO_PREFIXO_PADRAO = 1000
+TOP_N_PADRAO = 10
+TAMANHO_TRECHO_LISTA = 4 << 20
+
+# chaves_testadas conta as chaves pontuadas (o trabalho feito): uma chave
+# repetida em trechos diferentes da lista entra uma vez por trecho, e a
+# vazão por núcleo usa a mesma contagem.
+ResultadoDicionario = collections.namedtuple('ResultadoDicionario', [
+    'candidatos', 'chaves_testadas', 'chaves_por_segundo_por_nucleo',
+    'segundos', 'texto_plano'])
+
+
+class PontuadorPrefixo:
+    # Custo (log-verossimilhança negativa sob o modelo de letras do idioma)
+    # de decifrar o prefixo com uma chave. Para cada tamanho de chave, o
+    # custo de cada letra possível em cada coluna é calculado uma vez a
+    # partir do histograma da coluna; o custo de uma chave é a soma de uma
+    # entrada por coluna, interrompida assim que passa do limite.
+    def __init__(self, prefixo_limpo, modelo):
+        self.dados = analise.codificar(prefixo_limpo)
+        self.custos_letra = [-log_p for log_p in modelo.log_probabilidades]
+        self.por_tamanho = {}
+
+    def _custos_colunas(self, tam_chave):
+        custos = self.por_tamanho.get(tam_chave)
+        if custos is None:
+            custos = []
+            for contagens in analise.contagens_colunas(self.dados, tam_chave):
+                custos.append([
+                    sum(contagem * self.custos_letra[(letra - deslocamento) % 26]
+                        for letra, contagem in enumerate(contagens) if contagem)
+                    for deslocamento in range(26)])
+            self.por_tamanho[tam_chave] = custos
+        return custos
+
+    def custo(self, chave, limite=float('inf')):
+        custos = self._custos_colunas(len(chave))
+        total = 0.0
+        for custos_coluna, letra in zip(custos, chave):
+            total += custos_coluna[letra - ord('A')]
+            if total > limite:
+                return None
+        return total
+
+
+def _limites_lista(caminho, tamanho_trecho):
+    tamanho = os.path.getsize(caminho)
+    limites = [0]
+    with open(caminho, 'rb') as arquivo:
+        for posicao in range(tamanho_trecho, tamanho, tamanho_trecho):
+            if posicao <= limites[-1]:
+                continue
+            arquivo.seek(posicao)
+            arquivo.readline()
+            if arquivo.tell() < tamanho:
+                limites.append(arquivo.tell())
+    limites.append(tamanho)
+    return list(zip(limites, limites[1:]))
+
+
+def _atacar_trecho(caminho, inicio, fim, prefixo_limpo, idioma, top_n):
+    # Executado no processo trabalhador: lê só o seu trecho da lista via mmap
+    # e mantém os top_n melhores num heap (custo negativo no topo). Linhas
+    # do mesmo trecho que limpam para a mesma chave (lemon, LEMON, Lemon) são
+    # pontuadas uma vez só; entre trechos diferentes a repetição não é vista.
+    comeco = time.perf_counter()
+    modelo = obter_idioma(idioma)
+    pontuador = PontuadorPrefixo(prefixo_limpo, modelo)
+    melhores = []
+    vistas = set()
+    testadas = 0
+    with open(caminho, 'rb') as arquivo, \
+            mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        linhas = mapa[inicio:fim].decode('utf-8', 'replace').splitlines()
+    for linha in linhas:
+        chave = limpar_texto(linha, modelo)
+        if not chave or chave in vistas:
+            continue
+        vistas.add(chave)
+        testadas += 1
+        limite = -melhores[0][0] if len(melhores) >= top_n else float('inf')
+        custo = pontuador.custo(chave.encode('ascii'), limite)
+        if custo is None:
+            continue
+        if len(melhores) < top_n:
+            heapq.heappush(melhores, (-custo, chave))
+        else:
+            heapq.heapreplace(melhores, (-custo, chave))
+    candidatos = [(chave, -custo_negativo) for custo_negativo, chave in melhores]
+    return candidatos, testadas, time.perf_counter() - comeco
+
+
+def ataque_dicionario(texto_cifrado, caminho_lista, idioma=IDIOMA_PADRAO,
+                      top_n=TOP_N_PADRAO, trabalhadores=None,
+                      tamanho_prefixo=TAMANHO_PREFIXO_PADRAO,
+                      tamanho_trecho=TAMANHO_TRECHO_LISTA):
+    comeco = time.perf_counter()
+    modelo = obter_idioma(idioma)
+    texto_limpo = limpar_texto(texto_cifrado, modelo)
+    prefixo = texto_limpo[:tamanho_prefixo]
+    if not prefixo or os.path.getsize(caminho_lista) == 0:
+        return ResultadoDicionario([], 0, 0.0, 0.0, "")
+
+    trechos = _limites_lista(caminho_lista, tamanho_trecho)
+    candidatos = []
+    testadas = 0
+    segundos_trabalhadores = 0.0
+    with concurrent.futures.ProcessPoolExecutor(trabalhadores) as executor:
+        futuros = [executor.submit(_atacar_trecho, caminho_lista, inicio, fim,
+                                   prefixo, modelo.nome, top_n)
+                   for inicio, fim in trechos]
+        for futuro in concurrent.futures.as_completed(futuros):
+            candidatos_trecho, testadas_trecho, segundos = futuro.result()
+            candidatos.extend(candidatos_trecho)
+            testadas += testadas_trecho
+            segundos_trabalhadores += segundos
+
+    # Uma chave repetida em trechos diferentes tem o mesmo custo em todos.
+    candidatos = sorted(set(candidatos), key=lambda item: (item[1], item[0]))[:top_n]
+    texto_plano = (decifrar_vigenere(texto_limpo, candidatos[0][0])
+                   if candidatos else "")
+    por_nucleo = (testadas / segundos_trabalhadores
+                  if segundos_trabalhadores else 0.0)
+    return ResultadoDicionario(candidatos, testadas, por_nucleo,
+                               time.perf_counter() - comeco, texto_plano)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ataque de dicionário à cifra de Vigenère.")
+    parser.add_argument('entrada', help="Arquivo com o texto cifrado.")
+    parser.add_argument('lista', help="Lista de chaves, uma por linha.")
+    parser.add_argument('-i', '--idioma', default=IDIOMA_PADRAO)
+    parser.add_argument('-n', '--top', type=int, default=TOP_N_PADRAO)
+    parser.add_argument('-p', '--processos', type=int)
+    parser.add_argument('--prefixo', type=int, default=TAMANHO_PREFIXO_PADRAO,
+                        help="Letras do texto cifrado usadas na pontuação.")
+    args = parser.parse_args(argv)
+
+    with open(args.entrada, encoding='utf-8') as arquivo:
+        texto_cifrado = arquivo.read()
+    resultado = ataque_dicionario(texto_cifrado, args.lista, args.idioma,
+                                  args.top, args.processos, args.prefixo)
+    for posicao, (chave, custo) in enumerate(resultado.candidatos, 1):
+        print(f"{posicao:>3}. {chave} (custo {custo:.1f})")
+    print(f"{resultado.chaves_testadas} chaves pontuadas em "
+          f"{resultado.segundos:.2f} s "
+          f"({resultado.chaves_por_segundo_por_nucleo:.0f} chaves/s por núcleo).")
+    if resultado.candidatos:
+        print(f"Texto Plano (primeiros 200 caracteres): {resultado.texto_plano[:200]}...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import collections
+import contextlib
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+FASE_DETECCAO_IDIOMA = 'deteccao_idioma'
+FASE_LIMPEZA = 'limpeza'
+FASE_TAMANHO_CHAVE = 'tamanho_chave'
+FASE_COLUNAS = 'colunas'
+FASE_COLUNA = 'coluna'
+FASE_DECIFRAGEM = 'decifragem'
+FASE_AMOSTRA = 'amostra'
+FASES = (FASE_DETECCAO_IDIOMA, FASE_LIMPEZA, FASE_TAMANHO_CHAVE,
+         FASE_COLUNAS, FASE_COLUNA, FASE_DECIFRAGEM, FASE_AMOSTRA)
+
+Evento = collections.namedtuple('Evento', [
+    'fase', 'segundos', 'tamanho_entrada', 'dados', 'erro'], defaults=(None,))
+
+
+class Observador:
+    # Interface dos destinos de eventos. inicio é chamado antes de cada fase
+    # e fim com o Evento já medido; se a fase falhou, evento.erro guarda a
+    # exceção e os dados podem estar incompletos. O padrão não faz nada.
+    def inicio(self, fase):
+        pass
+
+    def fim(self, evento):
+        pass
+
+
+OBSERVADOR_NULO = Observador()
+
+
+@contextlib.contextmanager
+def fase(observador, nome, tamanho_entrada):
+    # Mede a fase e emite o Evento ao sair; o bloco preenche o dicionário
+    # devolvido com os resultados intermediários. Uma falha também emite o
+    # Evento, marcado com erro, para os observadores fecharem o que abriram
+    # em inicio, e a exceção original segue para o chamador.
+    dados = {}
+    observador.inicio(nome)
+    inicio = time.perf_counter()
+    try:
+        yield dados
+    except BaseException as erro:
+        observador.fim(Evento(nome, time.perf_counter() - inicio,
+                              tamanho_entrada, dados, erro))
+        raise
+    observador.fim(Evento(nome, time.perf_counter() - inicio,
+                          tamanho_entrada, dados))
+
+
+class Observadores(Observador):
+    def __init__(self, *observadores):
+        self.observadores = observadores
+
+    def inicio(self, fase):
+        for observador in self.observadores:
+            observador.inicio(fase)
+
+    def fim(self, evento):
+        for observador in self.observadores:
+            observador.fim(evento)
+
+
+class RegistradorEventos(Observador):
+    def __init__(self, logger=None, nivel=logging.INFO):
+        self.logger = logger or logging.getLogger('vigenere')
+        self.nivel = nivel
+
+    def fim(self, evento):
+        if not self.logger.isEnabledFor(self.nivel):
+            return
+        if evento.erro is not None:
+            self.logger.log(self.nivel, "%s: falhou após %.6f s: %r",
+                            evento.fase, evento.segundos, evento.erro)
+            return
+        self.logger.log(self.nivel, "%s: %.6f s, %d caracteres, %s",
+                        evento.fase, evento.segundos, evento.tamanho_entrada,
+                        {nome: valor for nome, valor in evento.dados.items()
+                         if not isinstance(valor, str) or len(valor) <= 100})
+
+
+class ContadorEventos(Observador):
+    # Acumula chamadas, tempo e caracteres por fase (também das que falharam).
+    # Com perfil=True, liga um cProfile.Profile só durante as fases, sem
+    # contar o código do chamador.
+    def __init__(self, perfil=False):
+        self.chamadas = collections.Counter()
+        self.segundos = collections.Counter()
+        self.caracteres = collections.Counter()
+        self.perfil = cProfile.Profile() if perfil else None
+
+    def inicio(self, fase):
+        if self.perfil is not None:
+            self.perfil.enable()
+
+    def fim(self, evento):
+        if self.perfil is not None:
+            self.perfil.disable()
+        self.chamadas[evento.fase] += 1
+        self.segundos[evento.fase] += evento.segundos
+        self.caracteres[evento.fase] += evento.tamanho_entrada
+
+    def relatorio(self, limite=20):
+        linhas = [f"{'Fase':<16} {'Chamadas':>9} {'Tempo (s)':>10} {'Caracteres':>12}"]
+        for nome in sorted(self.segundos, key=self.segundos.__getitem__,
+                           reverse=True):
+            linhas.append(f"{nome:<16} {self.chamadas[nome]:>9} "
+                          f"{self.segundos[nome]:>10.4f} {self.caracteres[nome]:>12}")
+        if self.perfil is not None:
+            saida = io.StringIO()
+            pstats.Stats(self.perfil, stream=saida).sort_stats(
+                'cumulative').print_stats(limite)
+            linhas.append(saida.getvalue())
+        return "\n".join(linhas)
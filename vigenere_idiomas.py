@@ -0,0 +1,159 @@
+import codecs
+import collections
+import hashlib
+import json
+import math
+import os
+import unicodedata
+
+from vigenere_analise import ALFABETO
+
+DIRETORIO_IDIOMAS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'idiomas')
+
+# Letras latinas sem decomposição canônica para a letra base.
+TRANSLITERACOES = {
+    'Æ': 'AE', 'æ': 'ae', 'Œ': 'OE', 'œ': 'oe', 'Ø': 'O', 'ø': 'o',
+    'Đ': 'D', 'đ': 'd', 'Ð': 'D', 'ð': 'd', 'Ł': 'L', 'ł': 'l',
+    'Þ': 'TH', 'þ': 'th', 'Ħ': 'H', 'ħ': 'h', 'Ŧ': 'T', 'ŧ': 't',
+    'ẞ': 'SS',
+}
+# Latin-1, Latin Extended-A/B e Latin Extended Additional entram na tabela
+# já na criação; qualquer outro código é resolvido na primeira ocorrência.
+FAIXAS_PRE_CALCULADAS = (range(0x250), range(0x1E00, 0x1F00))
+
+# Modelo de idioma carregado uma única vez em vetores indexados por letra
+# (A = 0, ..., Z = 25), prontos para as rotinas de pontuação.
+ModeloIdioma = collections.namedtuple('ModeloIdioma', [
+    'nome', 'frequencias', 'log_probabilidades', 'ic', 'substituicoes',
+    'tabela_normalizacao'])
+
+_REGISTRO = {}
+
+
+def _somente_letras(texto):
+    letras = ''.join(caractere for caractere in texto.upper()
+                     if 'A' <= caractere <= 'Z')
+    return letras or None
+
+
+class TabelaLimpeza(dict):
+    # Mapeamento para str.translate que leva cada caractere diretamente às
+    # letras A-Z que ele representa (ou o remove), numa única passada.
+    def __init__(self, substituicoes=None):
+        super().__init__()
+        self.substituicoes = dict(TRANSLITERACOES)
+        self.substituicoes.update(substituicoes or {})
+        for faixa in FAIXAS_PRE_CALCULADAS:
+            for codigo in faixa:
+                self[codigo]
+
+    def __missing__(self, codigo):
+        caractere = chr(codigo)
+        if caractere in self.substituicoes:
+            resultado = _somente_letras(self.substituicoes[caractere])
+        else:
+            resultado = _somente_letras(
+                unicodedata.normalize('NFKD', caractere))
+        self[codigo] = resultado
+        return resultado
+
+    def _preparar_caminho_rapido(self):
+        # Latin-1 vira uma tabela de 256 bytes para bytes.translate. Os poucos
+        # caracteres que viram mais de uma letra (Æ, ß, Þ...) são trocados
+        # antes com str.replace, e os acima de U+00FF são resolvidos pelo
+        # tratador de erro do codec, só onde aparecem.
+        tabela_bytes = bytearray(range(256))
+        remover = bytearray()
+        multiplos = []
+        for codigo in range(256):
+            resultado = self[codigo]
+            if resultado is None:
+                remover.append(codigo)
+            elif len(resultado) == 1:
+                tabela_bytes[codigo] = ord(resultado)
+            else:
+                multiplos.append((chr(codigo), resultado))
+        # O nome do tratador depende só das substituições: tabelas iguais,
+        # inclusive cópias desserializadas em outros processos, o compartilham.
+        assinatura = hashlib.sha1(
+            repr(sorted(self.substituicoes.items())).encode('utf-8')).hexdigest()
+        self._caminho_rapido = (bytes(tabela_bytes), bytes(remover), multiplos,
+                                f'vigenere_limpeza_{assinatura}')
+
+    def _tratar_erro_codec(self, erro):
+        trecho = erro.object[erro.start:erro.end]
+        return ''.join([self[ord(caractere)] or '' for caractere in trecho]), erro.end
+
+    def limpar(self, texto):
+        # Mesmo resultado de texto.translate(self), mas sem sair do C para
+        # texto latino: str.translate com um mapeamento Python só é rápido
+        # enquanto a entrada é toda ASCII.
+        if '_caminho_rapido' not in self.__dict__:
+            self._preparar_caminho_rapido()
+        tabela_bytes, remover, multiplos, nome_erro = self._caminho_rapido
+        try:
+            codecs.lookup_error(nome_erro)
+        except LookupError:
+            codecs.register_error(nome_erro, self._tratar_erro_codec)
+        for caractere, letras in multiplos:
+            if caractere in texto:
+                texto = texto.replace(caractere, letras)
+        return texto.encode('latin-1', nome_erro).translate(
+            tabela_bytes, remover).decode('ascii')
+
+
+def criar_modelo(nome, frequencias, ic, substituicoes=None):
+    faltando = set(ALFABETO) - set(frequencias)
+    if faltando:
+        raise ValueError(
+            f"Idioma {nome!r} sem frequência para: {''.join(sorted(faltando))}.")
+    vetor = tuple(float(frequencias[letra]) for letra in ALFABETO)
+    return ModeloIdioma(
+        nome=nome,
+        frequencias=vetor,
+        log_probabilidades=tuple(
+            math.log(frequencia) if frequencia > 0 else float('-inf')
+            for frequencia in vetor),
+        ic=float(ic),
+        substituicoes=dict(substituicoes or {}),
+        tabela_normalizacao=TabelaLimpeza(substituicoes))
+
+
+def carregar_idioma(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        dados = json.load(arquivo)
+    nome = dados.get('nome') or os.path.splitext(os.path.basename(caminho))[0]
+    return criar_modelo(nome, dados['frequencias'], dados['ic'],
+                        dados.get('substituicoes'))
+
+
+def registrar_idioma(modelo):
+    _REGISTRO[modelo.nome] = modelo
+    return modelo
+
+
+def obter_idioma(idioma):
+    if isinstance(idioma, ModeloIdioma):
+        return idioma
+    if idioma not in _REGISTRO:
+        caminho = os.path.join(DIRETORIO_IDIOMAS, f'{idioma}.json')
+        if not os.path.exists(caminho):
+            raise ValueError(
+                f"Idioma desconhecido: {idioma!r}. "
+                f"Disponíveis: {', '.join(idiomas_disponiveis())}.")
+        registrar_idioma(carregar_idioma(caminho))
+    return _REGISTRO[idioma]
+
+
+def idiomas_disponiveis():
+    nomes = set(_REGISTRO)
+    if os.path.isdir(DIRETORIO_IDIOMAS):
+        nomes.update(os.path.splitext(arquivo)[0]
+                     for arquivo in os.listdir(DIRETORIO_IDIOMAS)
+                     if arquivo.endswith('.json'))
+    return sorted(nomes)
+
+
+def carregar_todos():
+    return [obter_idioma(nome) for nome in idiomas_disponiveis()]
@@ -0,0 +1,177 @@
+import collections
+
+import vigenere_analise as analise
+from vigenere_ataque import (DETECCAO_AUTOMATICA, IDIOMA_PADRAO,
+                             decifrar_vigenere, limpar_texto)
+from vigenere_eventos import (FASE_AMOSTRA, FASE_DECIFRAGEM, FASE_LIMPEZA,
+                              OBSERVADOR_NULO, fase)
+from vigenere_idiomas import carregar_todos, obter_idioma
+
+EstimativaIncremental = collections.namedtuple('EstimativaIncremental', [
+    'idioma', 'tamanho_chave', 'chave', 'confianca', 'letras_vistas'])
+
+
+class AtaqueIncremental:
+    # Ataque que acompanha um texto cifrado recebido em blocos. Guarda apenas
+    # contagens de letras por (tamanho, coluna) para os tamanhos acima de
+    # max_tam_chave // 2; os menores saem da soma das colunas (ver
+    # analise.expandir_contagens). Nenhum bloco é relido depois de contado,
+    # e uma estimativa custa o mesmo qualquer que seja o volume já visto.
+    # Os métodos 'kasiski' e 'combinado' também mantêm um
+    # analise.HistogramaDistancias, atualizado a cada bloco.
+    def __init__(self, max_tam_chave=20, idioma=IDIOMA_PADRAO,
+                 metodo_tamanho='ic'):
+        if max_tam_chave < 1:
+            raise ValueError("max_tam_chave deve ser pelo menos 1.")
+        if metodo_tamanho not in analise.METODOS_TAMANHO:
+            raise ValueError(
+                f"Método desconhecido: {metodo_tamanho!r}. "
+                f"Use um de: {', '.join(analise.METODOS_TAMANHO)}.")
+        self.max_tam_chave = max_tam_chave
+        self.idioma = idioma
+        self.metodo_tamanho = metodo_tamanho
+        self.distancias = (None if metodo_tamanho == 'ic' else
+                           analise.HistogramaDistancias())
+        if idioma != DETECCAO_AUTOMATICA:
+            obter_idioma(idioma)
+        self.contagens = {
+            tam_chave: [[0] * 26 for _ in range(tam_chave)]
+            for tam_chave in range(max_tam_chave // 2 + 1, max_tam_chave + 1)}
+        self.letras_vistas = 0
+        self._matrizes = None
+
+    def adicionar(self, bloco):
+        dados = analise.codificar(limpar_texto(bloco, self.idioma))
+        for tam_chave, contagens in self.contagens.items():
+            for coluna in range(tam_chave):
+                # Primeira posição do bloco que cai nesta coluna, levando em
+                # conta as letras dos blocos anteriores.
+                inicio = (coluna - self.letras_vistas) % tam_chave
+                trecho = dados[inicio::tam_chave]
+                if trecho:
+                    contagens_coluna = contagens[coluna]
+                    for letra, contagem in enumerate(analise.contar_letras(trecho)):
+                        contagens_coluna[letra] += contagem
+        if self.distancias is not None:
+            self.distancias.adicionar(dados)
+        self.letras_vistas += len(dados)
+        self._matrizes = None
+        return len(dados)
+
+    def matrizes(self):
+        if self._matrizes is None:
+            self._matrizes = dict(analise.expandir_contagens(
+                self.contagens.__getitem__, self.max_tam_chave))
+        return self._matrizes
+
+    def ics(self):
+        ics = {}
+        for tam_chave, contagens in sorted(self.matrizes().items()):
+            ic_medio = analise.ic_medio_colunas(contagens)
+            if ic_medio is not None:
+                ics[tam_chave] = ic_medio
+        return ics
+
+    def _escolher_tamanho(self, modelo, ics, candidatos):
+        if self.metodo_tamanho == 'kasiski':
+            return analise.escolher_tamanho_kasiski(candidatos)
+        if self.metodo_tamanho == 'combinado' and candidatos:
+            return analise.escolher_tamanho_combinado(candidatos, ics, modelo.ic)
+        return analise.escolher_tamanho_chave(ics, modelo.ic)
+
+    def _estimar(self, modelo, ics, candidatos):
+        tam_chave = self._escolher_tamanho(modelo, ics, candidatos)
+        chave = ""
+        qui_quadrado_total = 0.0
+        margens = []
+        for contagens in self.matrizes()[tam_chave]:
+            if not sum(contagens):
+                continue
+            ranking = analise.ranquear_deslocamentos(
+                analise.pontuar_deslocamentos(contagens, modelo.frequencias))
+            (letra, melhor), (_, segundo) = ranking[0], ranking[1]
+            chave += letra
+            qui_quadrado_total += melhor
+            # Margem relativa entre a melhor e a segunda letra da coluna.
+            margens.append((segundo - melhor) / segundo if segundo else 0.0)
+        confianca = sum(margens) / len(margens) if margens else 0.0
+        return tam_chave, chave, confianca, qui_quadrado_total
+
+    def estimativa(self):
+        if self.letras_vistas == 0:
+            return EstimativaIncremental(None, 0, "", 0.0, 0)
+        ics = self.ics()
+        candidatos = (None if self.distancias is None else
+                      analise.candidatos_histograma(self.distancias.histograma,
+                                                    self.max_tam_chave))
+        if self.idioma == DETECCAO_AUTOMATICA:
+            modelos = carregar_todos()
+        else:
+            modelos = [obter_idioma(self.idioma)]
+        melhor = None
+        for modelo in modelos:
+            tam_chave, chave, confianca, qui_quadrado_total = self._estimar(
+                modelo, ics, candidatos)
+            if melhor is None or qui_quadrado_total < melhor[0]:
+                melhor = (qui_quadrado_total, modelo.nome, tam_chave, chave,
+                          confianca)
+        _, nome, tam_chave, chave, confianca = melhor
+        return EstimativaIncremental(nome, tam_chave, chave, confianca,
+                                     self.letras_vistas)
+
+
+ResultadoAdaptativo = collections.namedtuple('ResultadoAdaptativo', [
+    'idioma', 'tamanho_chave', 'chave', 'confianca', 'caracteres_lidos',
+    'caracteres_totais', 'texto_plano'])
+
+TAMANHO_AMOSTRA_INICIAL = 1000
+CONFIANCA_MINIMA = 0.9
+ESTIMATIVAS_ESTAVEIS = 3
+
+
+def atacar_adaptativo(texto_cifrado, max_tam_chave=20, idioma=IDIOMA_PADRAO,
+                      tamanho_inicial=TAMANHO_AMOSTRA_INICIAL,
+                      confianca_minima=CONFIANCA_MINIMA,
+                      estimativas_estaveis=ESTIMATIVAS_ESTAVEIS,
+                      metodo_tamanho='ic', observador=OBSERVADOR_NULO):
+    # Lê prefixos que dobram de tamanho e para quando a chave (reduzida ao
+    # menor período) se repete em estimativas_estaveis estimativas seguidas
+    # com confiança mínima. Cada prefixo só acrescenta o trecho novo ao
+    # AtaqueIncremental; só depois o texto inteiro é decifrado. Cada prefixo
+    # emite um evento 'amostra'; a limpeza e a decifragem finais emitem os
+    # eventos de sempre.
+    ataque = AtaqueIncremental(max_tam_chave, idioma, metodo_tamanho)
+    total = len(texto_cifrado)
+    lidos = 0
+    proximo = max(tamanho_inicial, 1)
+    anteriores = collections.deque(maxlen=max(estimativas_estaveis, 1))
+    estimativa = ataque.estimativa()
+    while lidos < total:
+        fim = min(proximo, total)
+        with fase(observador, FASE_AMOSTRA, fim - lidos) as dados:
+            ataque.adicionar(texto_cifrado[lidos:fim])
+            lidos = fim
+            proximo *= 2
+            estimativa = ataque.estimativa()
+            dados.update(caracteres_lidos=lidos,
+                         tamanho_chave=estimativa.tamanho_chave,
+                         chave=estimativa.chave,
+                         confianca=estimativa.confianca)
+        anteriores.append(analise.menor_periodo(estimativa.chave))
+        if (len(anteriores) == anteriores.maxlen
+                and len(set(anteriores)) == 1
+                and estimativa.confianca >= confianca_minima):
+            break
+
+    chave = analise.menor_periodo(estimativa.chave)
+    if not chave:
+        return ResultadoAdaptativo(estimativa.idioma, 0, "", 0.0, lidos, total, "")
+    with fase(observador, FASE_LIMPEZA, total) as dados:
+        texto_limpo = limpar_texto(texto_cifrado, estimativa.idioma)
+        dados['texto_limpo'] = texto_limpo
+    with fase(observador, FASE_DECIFRAGEM, len(texto_limpo)) as dados:
+        texto_plano = decifrar_vigenere(texto_limpo, chave)
+        dados['chave'] = chave
+        dados['texto_plano'] = texto_plano
+    return ResultadoAdaptativo(estimativa.idioma, len(chave), chave,
+                               estimativa.confianca, lidos, total, texto_plano)
@@ -0,0 +1,197 @@
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import signal
+import sys
+import time
+
+import vigenere_analise as analise
+from vigenere_ataque import IDIOMA_PADRAO, atacar
+
+INTERVALO_PROGRESSO = 1.0
+
+# Cache aberto uma vez por processo trabalhador (ver _atacar_item).
+_cache_processo = None
+
+
+class TempoEsgotado(Exception):
+    pass
+
+
+class ErroLeitura(Exception):
+    # Ocupa o lugar do texto de um item que não pôde ser lido; atacar_lote
+    # o transforma num registro de erro em vez de interromper o lote.
+    pass
+
+
+def _alarme(numero_sinal, quadro):
+    raise TempoEsgotado()
+
+
+def ler_itens(caminho):
+    # Diretório: um texto cifrado por arquivo. JSONL: um objeto por linha com
+    # "texto_cifrado" e, opcionalmente, "id". Os itens são lidos sob demanda.
+    if os.path.isdir(caminho):
+        for nome in sorted(os.listdir(caminho)):
+            caminho_arquivo = os.path.join(caminho, nome)
+            if os.path.isfile(caminho_arquivo):
+                with open(caminho_arquivo, encoding='utf-8',
+                          errors='replace') as arquivo:
+                    yield nome, arquivo.read()
+        return
+
+    arquivo = sys.stdin if caminho == '-' else open(caminho, encoding='utf-8')
+    try:
+        for numero_linha, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            identificador = numero_linha
+            try:
+                registro = json.loads(linha)
+                identificador = registro.get('id', numero_linha)
+                texto_cifrado = registro['texto_cifrado']
+                if not isinstance(texto_cifrado, str):
+                    raise TypeError("'texto_cifrado' deve ser uma string.")
+            except (ValueError, AttributeError, KeyError, TypeError) as erro:
+                yield identificador, ErroLeitura(
+                    f"Linha {numero_linha}: {type(erro).__name__}: {erro}")
+                continue
+            yield identificador, texto_cifrado
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def _obter_cache(caminho_cache):
+    global _cache_processo
+    if _cache_processo is None:
+        from vigenere_cache import CacheAtaque
+        _cache_processo = CacheAtaque(caminho=caminho_cache)
+    return _cache_processo
+
+
+def _atacar_item(identificador, texto_cifrado, parametros, tempo_limite,
+                 caminho_cache=None):
+    # Executado no processo trabalhador. O limite de tempo usa SIGALRM, que
+    # interrompe o próprio ataque sem derrubar o processo do pool.
+    inicio = time.perf_counter()
+    usar_alarme = tempo_limite is not None and hasattr(signal, 'setitimer')
+    registro = {'id': identificador, 'tamanho_texto': len(texto_cifrado)}
+    # O alarme é armado e desarmado dentro do try externo: se disparar em
+    # qualquer ponto entre os dois (até dentro do finally), TempoEsgotado é
+    # capturado aqui e nunca escapa para o processo principal.
+    try:
+        if usar_alarme:
+            signal.signal(signal.SIGALRM, _alarme)
+            signal.setitimer(signal.ITIMER_REAL, tempo_limite)
+        try:
+            if caminho_cache is None:
+                resultado = atacar(texto_cifrado, **parametros)
+            else:
+                resultado = _obter_cache(caminho_cache).atacar(
+                    texto_cifrado, **parametros)
+        finally:
+            if usar_alarme:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        registro.update(idioma=resultado.idioma,
+                        tamanho_chave=resultado.tamanho_chave,
+                        chave=resultado.chave,
+                        pontuacao=resultado.pontuacao)
+    except TempoEsgotado:
+        registro['erro'] = f"Tempo limite de {tempo_limite} s excedido."
+    except Exception as erro:
+        registro['erro'] = f"{type(erro).__name__}: {erro}"
+    registro['segundos'] = time.perf_counter() - inicio
+    return registro
+
+
+def atacar_lote(itens, trabalhadores=None, tempo_limite=None,
+                max_tam_chave=20, metodo_tamanho='ic', idioma=IDIOMA_PADRAO,
+                caminho_cache=None):
+    # Gera um registro por item assim que o ataque termina (fora de ordem).
+    # No máximo 2 * trabalhadores itens ficam em memória ao mesmo tempo.
+    if tempo_limite is not None and tempo_limite <= 0:
+        # setitimer com zero desligaria o limite em vez de aplicá-lo.
+        raise ValueError("O tempo limite deve ser positivo.")
+    parametros = {'max_tam_chave': max_tam_chave,
+                  'metodo_tamanho': metodo_tamanho, 'idioma': idioma}
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    itens = iter(itens)
+    with concurrent.futures.ProcessPoolExecutor(trabalhadores) as executor:
+        pendentes = set()
+        while True:
+            for identificador, texto_cifrado in itens:
+                if isinstance(texto_cifrado, ErroLeitura):
+                    yield {'id': identificador, 'erro': str(texto_cifrado)}
+                    continue
+                pendentes.add(executor.submit(
+                    _atacar_item, identificador, texto_cifrado, parametros,
+                    tempo_limite, caminho_cache))
+                if len(pendentes) >= 2 * trabalhadores:
+                    break
+            if not pendentes:
+                return
+            concluidos, pendentes = concurrent.futures.wait(
+                pendentes, return_when=concurrent.futures.FIRST_COMPLETED)
+            for futuro in concluidos:
+                yield futuro.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ataque de frequência em lote sobre muitos textos cifrados.")
+    parser.add_argument('entrada',
+                        help="Diretório com um texto por arquivo ou arquivo "
+                             "JSONL ('-' para stdin).")
+    parser.add_argument('-o', '--saida', default='-',
+                        help="Arquivo JSONL de resultados ('-' para stdout).")
+    parser.add_argument('-p', '--processos', type=int)
+    parser.add_argument('-T', '--tempo-limite', type=float,
+                        help="Tempo máximo por item, em segundos.")
+    parser.add_argument('-i', '--idioma', default=IDIOMA_PADRAO)
+    parser.add_argument('-t', '--max-tam-chave', type=int, default=20)
+    parser.add_argument('-m', '--metodo', choices=analise.METODOS_TAMANHO,
+                        default='ic')
+    parser.add_argument('-c', '--cache',
+                        help="Arquivo SQLite para reaproveitar resultados "
+                             "entre execuções.")
+    parser.add_argument('-q', '--silencioso', action='store_true',
+                        help="Não mostra o progresso em stderr.")
+    args = parser.parse_args(argv)
+    if args.tempo_limite is not None and args.tempo_limite <= 0:
+        parser.error("O tempo limite deve ser positivo.")
+
+    saida = sys.stdout if args.saida == '-' else open(
+        args.saida, 'w', encoding='utf-8')
+    inicio = time.perf_counter()
+    ultimo_progresso = inicio
+    contagem = collections.Counter()
+    try:
+        for registro in atacar_lote(ler_itens(args.entrada), args.processos,
+                                    args.tempo_limite, args.max_tam_chave,
+                                    args.metodo, args.idioma, args.cache):
+            saida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            saida.flush()
+            contagem['erros' if 'erro' in registro else 'ok'] += 1
+            agora = time.perf_counter()
+            if not args.silencioso and agora - ultimo_progresso >= INTERVALO_PROGRESSO:
+                ultimo_progresso = agora
+                total = sum(contagem.values())
+                print(f"Processados: {total} ({contagem['erros']} erros, "
+                      f"{total / (agora - inicio):.1f} itens/s)",
+                      file=sys.stderr)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    if not args.silencioso:
+        total = sum(contagem.values())
+        duracao = time.perf_counter() - inicio
+        print(f"Concluído: {total} itens ({contagem['erros']} erros) em "
+              f"{duracao:.2f} s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import argparse
+import array
+import collections
+import math
+import operator
+import os
+import time
+
+import vigenere_analise as analise
+from vigenere_ataque import (IDIOMA_PADRAO, atacar, decifrar_vigenere,
+                             limpar_texto)
+from vigenere_idiomas import DIRETORIO_IDIOMAS, obter_idioma
+
+NUM_QUADGRAMAS = 26 ** 4
+PESOS = (26 ** 3, 26 ** 2, 26, 1)
+MAX_RODADAS = 20
+
+ResultadoRefinamento = collections.namedtuple('ResultadoRefinamento', [
+    'chave', 'pontuacao', 'chaves_avaliadas', 'segundos', 'texto_plano'])
+
+_TABELAS = {}
+
+
+def caminho_tabela(idioma):
+    return os.path.join(DIRETORIO_IDIOMAS,
+                        f'{obter_idioma(idioma).nome}.quadgramas')
+
+
+def tabela_de_contagens(contagens):
+    # Tabela densa de 26^4 log10-probabilidades indexada por
+    # a * 26^3 + b * 26^2 + c * 26 + d; quadgramas nunca vistos recebem um
+    # piso bem abaixo do menos frequente.
+    total = sum(contagens.values())
+    if total == 0:
+        raise ValueError("Nenhum quadgrama para treinar a tabela.")
+    tabela = array.array('f', [math.log10(0.01 / total)]) * NUM_QUADGRAMAS
+    for quadgrama, contagem in contagens.items():
+        indice = sum(peso * (ord(letra) - ord('A'))
+                     for peso, letra in zip(PESOS, quadgrama))
+        tabela[indice] = math.log10(contagem / total)
+    return tabela
+
+
+def treinar_quadgramas(textos, idioma=IDIOMA_PADRAO):
+    # Aceita um texto ou um iterável de blocos; o final de cada bloco é
+    # emendado ao seguinte para não perder os quadgramas da fronteira.
+    if isinstance(textos, str):
+        textos = [textos]
+    contagens = collections.Counter()
+    sobra = ''
+    for bloco in textos:
+        texto = sobra + limpar_texto(bloco, idioma)
+        contagens.update(texto[i:i + 4] for i in range(len(texto) - 3))
+        sobra = texto[-3:]
+    return tabela_de_contagens(contagens)
+
+
+def ler_contagens(caminho):
+    # Formato usual das listas publicadas: "TION 13168375" por linha.
+    contagens = {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if len(partes) == 2 and len(partes[0]) == 4:
+                contagens[partes[0].upper()] = int(partes[1])
+    return contagens
+
+
+def salvar_tabela(tabela, caminho):
+    with open(caminho, 'wb') as arquivo:
+        tabela.tofile(arquivo)
+
+
+def carregar_tabela(caminho):
+    tabela = array.array('f')
+    with open(caminho, 'rb') as arquivo:
+        tabela.fromfile(arquivo, NUM_QUADGRAMAS)
+    return tabela
+
+
+def obter_tabela(idioma=IDIOMA_PADRAO):
+    nome = obter_idioma(idioma).nome
+    if nome not in _TABELAS:
+        caminho = caminho_tabela(nome)
+        if not os.path.exists(caminho):
+            raise FileNotFoundError(
+                f"Tabela de quadgramas de {nome!r} não encontrada em {caminho}. "
+                f"Gere-a com: python vigenere_quadgramas.py treinar "
+                f"<corpus.txt> --idioma {nome}")
+        _TABELAS[nome] = carregar_tabela(caminho)
+    return _TABELAS[nome]
+
+
+class AvaliadorQuadgramas:
+    # Pontua chaves de um tamanho fixo para um texto cifrado limpo. Os
+    # quadgramas cifrados são agrupados pelo resíduo r = posição % tamanho
+    # da chave: a pontuação do grupo r depende só das letras da chave nas
+    # colunas r .. r + 3, então trocar uma letra só recalcula 4 grupos.
+    def __init__(self, texto_limpo, tam_chave, tabela):
+        self.tam_chave = tam_chave
+        self.tabela = tabela
+        digitos = [letra - ord('A') for letra in analise.codificar(texto_limpo)]
+        grupos = [collections.Counter() for _ in range(tam_chave)]
+        for posicao in range(len(digitos) - 3):
+            grupos[posicao % tam_chave][tuple(digitos[posicao:posicao + 4])] += 1
+        self.grupos = [list(grupo.items()) for grupo in grupos]
+        self.chaves_avaliadas = 0
+
+    def _deslocamentos(self, residuo, deslocamentos):
+        return [deslocamentos[(residuo + m) % self.tam_chave] for m in range(4)]
+
+    def pontuar_grupo(self, residuo, deslocamentos):
+        d0, d1, d2, d3 = self._deslocamentos(residuo, deslocamentos)
+        tabela = self.tabela
+        return sum(
+            contagem * tabela[((a - d0) % 26) * 17576 + ((b - d1) % 26) * 676
+                              + ((c - d2) % 26) * 26 + (d - d3) % 26]
+            for (a, b, c, d), contagem in self.grupos[residuo])
+
+    def pontuar(self, deslocamentos):
+        self.chaves_avaliadas += 1
+        return sum(self.pontuar_grupo(residuo, deslocamentos)
+                   for residuo in range(self.tam_chave))
+
+    def _vetor_grupo(self, residuo, deslocamentos, digito):
+        # Pontuação do grupo para as 26 letras possíveis na posição `digito`
+        # do quadgrama, de uma vez: com as outras três letras fixas, as 26
+        # entradas da tabela formam uma fatia de passo PESOS[digito].
+        peso = PESOS[digito]
+        fixos = self._deslocamentos(residuo, deslocamentos)
+        por_letra_cifrada = [None] * 26
+        tabela = self.tabela
+        for quadgrama, contagem in self.grupos[residuo]:
+            base = sum(PESOS[m] * ((quadgrama[m] - fixos[m]) % 26)
+                       for m in range(4) if m != digito)
+            fatia = tabela[base:base + 26 * peso:peso]
+            if contagem != 1:
+                fatia = [valor * contagem for valor in fatia]
+            letra_cifrada = quadgrama[digito]
+            acumulado = por_letra_cifrada[letra_cifrada]
+            por_letra_cifrada[letra_cifrada] = (
+                list(fatia) if acumulado is None
+                else list(map(operator.add, acumulado, fatia)))
+        vetor = [0.0] * 26
+        for letra_cifrada, acumulado in enumerate(por_letra_cifrada):
+            if acumulado is None:
+                continue
+            # Com deslocamento s, a letra decifrada é (cifrada - s) % 26.
+            for deslocamento in range(26):
+                vetor[deslocamento] += acumulado[(letra_cifrada - deslocamento) % 26]
+        return vetor
+
+    def vetor_coluna(self, coluna, deslocamentos):
+        # Parte da pontuação que depende da coluna, para cada uma das 26
+        # letras da chave nessa coluna.
+        self.chaves_avaliadas += 26
+        if self.tam_chave < 4:
+            # Com chaves curtas a mesma coluna aparece mais de uma vez no
+            # quadgrama; pontua cada candidata por inteiro.
+            candidatos = list(deslocamentos)
+            vetor = []
+            for deslocamento in range(26):
+                candidatos[coluna] = deslocamento
+                vetor.append(sum(self.pontuar_grupo(residuo, candidatos)
+                                 for residuo in range(self.tam_chave)))
+            return vetor
+        vetor = [0.0] * 26
+        for digito in range(4):
+            residuo = (coluna - digito) % self.tam_chave
+            parcial = self._vetor_grupo(residuo, deslocamentos, digito)
+            vetor = list(map(operator.add, vetor, parcial))
+        return vetor
+
+
+def _para_deslocamentos(chave):
+    return [ord(letra) - ord('A') for letra in chave.upper()]
+
+
+def _para_chave(deslocamentos):
+    return ''.join(analise.ALFABETO[deslocamento] for deslocamento in deslocamentos)
+
+
+def refinar_chave(texto_limpo, chave_inicial, tabela, max_rodadas=MAX_RODADAS):
+    # Subida de encosta coordenada: para cada coluna escolhe a letra que
+    # maximiza a pontuação de quadgramas com as demais fixas, até uma rodada
+    # inteira não mudar nada.
+    inicio = time.perf_counter()
+    deslocamentos = _para_deslocamentos(chave_inicial)
+    avaliador = AvaliadorQuadgramas(texto_limpo, len(deslocamentos), tabela)
+    for _ in range(max_rodadas):
+        mudou = False
+        for coluna in range(len(deslocamentos)):
+            vetor = avaliador.vetor_coluna(coluna, deslocamentos)
+            melhor = max(range(26), key=vetor.__getitem__)
+            if vetor[melhor] > vetor[deslocamentos[coluna]]:
+                deslocamentos[coluna] = melhor
+                mudou = True
+        if not mudou:
+            break
+    chave = _para_chave(deslocamentos)
+    pontuacao = avaliador.pontuar(deslocamentos)
+    return ResultadoRefinamento(
+        chave, pontuacao, avaliador.chaves_avaliadas,
+        time.perf_counter() - inicio, decifrar_vigenere(texto_limpo, chave))
+
+
+def atacar_com_refinamento(texto_cifrado, max_tam_chave=20,
+                           metodo_tamanho='ic', idioma=IDIOMA_PADRAO,
+                           tabela=None):
+    resultado = atacar(texto_cifrado, max_tam_chave, metodo_tamanho, idioma)
+    if not resultado.chave:
+        return resultado, None
+    tabela = tabela if tabela is not None else obter_tabela(resultado.idioma)
+    texto_limpo = limpar_texto(texto_cifrado, resultado.idioma)
+    return resultado, refinar_chave(texto_limpo, resultado.chave, tabela)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tabelas de quadgramas e refinamento da chave por "
+                    "subida de encosta.")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    treinar = subcomandos.add_parser(
+        'treinar', help="Gera a tabela de quadgramas de um idioma.")
+    treinar.add_argument('corpus', help="Texto plano, ou lista 'QUAD contagem' "
+                                        "com --contagens.")
+    treinar.add_argument('-i', '--idioma', default=IDIOMA_PADRAO)
+    treinar.add_argument('--contagens', action='store_true')
+
+    refinar = subcomandos.add_parser(
+        'atacar', help="Ataque de frequência seguido do refinamento.")
+    refinar.add_argument('entrada')
+    refinar.add_argument('-i', '--idioma', default=IDIOMA_PADRAO)
+    refinar.add_argument('-t', '--max-tam-chave', type=int, default=20)
+    refinar.add_argument('-m', '--metodo', choices=analise.METODOS_TAMANHO,
+                         default='ic')
+    args = parser.parse_args(argv)
+
+    if args.comando == 'treinar':
+        if args.contagens:
+            tabela = tabela_de_contagens(ler_contagens(args.corpus))
+        else:
+            with open(args.corpus, encoding='utf-8', errors='replace') as arquivo:
+                blocos = iter(lambda: arquivo.read(1 << 20), '')
+                tabela = treinar_quadgramas(blocos, args.idioma)
+        caminho = caminho_tabela(args.idioma)
+        salvar_tabela(tabela, caminho)
+        print(f"Tabela salva em {caminho}.")
+        return
+
+    with open(args.entrada, encoding='utf-8') as arquivo:
+        texto_cifrado = arquivo.read()
+    resultado, refinado = atacar_com_refinamento(
+        texto_cifrado, args.max_tam_chave, args.metodo, args.idioma)
+    print(f"Chave do ataque de frequência: {resultado.chave}")
+    if refinado is not None:
+        print(f"Chave refinada: {refinado.chave} "
+              f"(pontuação {refinado.pontuacao:.1f})")
+        print(f"{refinado.chaves_avaliadas} chaves avaliadas em "
+              f"{refinado.segundos:.3f} s "
+              f"({refinado.chaves_avaliadas / refinado.segundos:.0f} chaves/s).")
+        print(f"Texto Plano (primeiros 200 caracteres): {refinado.texto_plano[:200]}...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import time
+
+import vigenere_analise as analise
+from vigenere_ataque import IDIOMA_PADRAO, atacar
+from vigenere_cipher import MOTOR_PADRAO, criptografar, descriptografar
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+MAX_FILA_PADRAO = 64
+MAX_LINHA = 16 << 20
+LIMITE_CIFRA_DIRETA = 64 << 10
+MAX_ACUMULADO_POR_ID = 64 << 20
+MAX_ACUMULADO_POR_CONEXAO = 128 << 20
+AMOSTRAS_LATENCIA = 1000
+FUNCOES_CIFRA = {'criptografar': criptografar,
+                 'descriptografar': descriptografar}
+OPERACOES = ('criptografar', 'descriptografar', 'atacar', 'metricas')
+
+
+class Sobrecarregado(Exception):
+    pass
+
+
+class TextosParciais:
+    # Trechos de ataque recebidos com "continua": true, por id. Os limites
+    # por id e por conexão impedem que a soma dos trechos contorne
+    # MAX_LINHA e a fila.
+    def __init__(self, max_por_id=MAX_ACUMULADO_POR_ID,
+                 max_total=MAX_ACUMULADO_POR_CONEXAO):
+        self.max_por_id = max_por_id
+        self.max_total = max_total
+        self.trechos = collections.defaultdict(list)
+        self.tamanhos = collections.Counter()
+        self.total = 0
+
+    def adicionar(self, identificador, texto):
+        if not isinstance(texto, str):
+            raise TypeError("'texto' deve ser uma string.")
+        if (self.tamanhos[identificador] + len(texto) > self.max_por_id or
+                self.total + len(texto) > self.max_total):
+            self.retirar(identificador)
+            raise ValueError(
+                "Texto acumulado excede o limite; o envio deste id foi "
+                "descartado.")
+        self.trechos[identificador].append(texto)
+        self.tamanhos[identificador] += len(texto)
+        self.total += len(texto)
+        return self.tamanhos[identificador]
+
+    def retirar(self, identificador):
+        self.total -= self.tamanhos.pop(identificador, 0)
+        return "".join(self.trechos.pop(identificador, []))
+
+
+def _atacar_servico(texto_cifrado, max_tam_chave, metodo_tamanho, idioma):
+    # Executado no pool de processos; devolve só tipos serializáveis em JSON.
+    return atacar(texto_cifrado, max_tam_chave, metodo_tamanho,
+                  idioma)._asdict()
+
+
+def _percentil(ordenadas, fracao):
+    return ordenadas[min(len(ordenadas) - 1, int(fracao * len(ordenadas)))]
+
+
+class ServidorVigenere:
+    # Protocolo: um objeto JSON por linha, nos dois sentidos. Requisições
+    # trazem "id" e "operacao" e as respostas podem sair fora de ordem,
+    # identificadas pelo mesmo "id".
+    #
+    # Payloads grandes vão em várias linhas: em criptografar/descriptografar
+    # cada trecho informa "fase" (caracteres já enviados antes dele) e é
+    # respondido isoladamente; em atacar, linhas com "continua": true
+    # acumulam o texto e a última dispara o ataque.
+    #
+    # Trabalho pesado (ataques e cifras acima de LIMITE_CIFRA_DIRETA) vai
+    # para o pool de processos. Com max_fila tarefas pendentes, novas
+    # requisições são recusadas com "sobrecarregado".
+    def __init__(self, trabalhadores=None, max_fila=MAX_FILA_PADRAO):
+        self.trabalhadores = trabalhadores
+        self.executor = concurrent.futures.ProcessPoolExecutor(trabalhadores)
+        self.max_fila = max_fila
+        self.pendentes = 0
+        self.max_pendentes = 0
+        self.requisicoes = collections.Counter()
+        self.recusadas = 0
+        self.erros = 0
+        self.latencias = collections.defaultdict(
+            lambda: collections.deque(maxlen=AMOSTRAS_LATENCIA))
+        self.servidores = []
+
+    async def iniciar(self, host=HOST_PADRAO, porta=PORTA_PADRAO,
+                      caminho_unix=None):
+        if caminho_unix is not None:
+            servidor = await asyncio.start_unix_server(
+                self._atender, caminho_unix, limit=MAX_LINHA)
+        else:
+            servidor = await asyncio.start_server(
+                self._atender, host, porta, limit=MAX_LINHA)
+        self.servidores.append(servidor)
+        return servidor
+
+    async def servir(self):
+        await asyncio.gather(*(servidor.serve_forever()
+                               for servidor in self.servidores))
+
+    async def fechar(self):
+        for servidor in self.servidores:
+            servidor.close()
+            await servidor.wait_closed()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def _no_pool(self, funcao, *argumentos):
+        if self.pendentes >= self.max_fila:
+            self.recusadas += 1
+            raise Sobrecarregado()
+        self.pendentes += 1
+        self.max_pendentes = max(self.max_pendentes, self.pendentes)
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, funcao, *argumentos)
+        except concurrent.futures.process.BrokenProcessPool:
+            # Um trabalhador morreu: as próximas requisições vão para um pool
+            # novo em vez de falharem para sempre.
+            if self.executor is executor:
+                self.executor = concurrent.futures.ProcessPoolExecutor(
+                    self.trabalhadores)
+                executor.shutdown(wait=False)
+            raise
+        finally:
+            self.pendentes -= 1
+
+    def metricas(self):
+        latencias = {}
+        for operacao, amostras in self.latencias.items():
+            ordenadas = sorted(amostras)
+            latencias[operacao] = {
+                'amostras': len(ordenadas),
+                'media_ms': 1000 * sum(ordenadas) / len(ordenadas),
+                'p50_ms': 1000 * _percentil(ordenadas, 0.50),
+                'p95_ms': 1000 * _percentil(ordenadas, 0.95),
+                'p99_ms': 1000 * _percentil(ordenadas, 0.99),
+                'max_ms': 1000 * ordenadas[-1],
+            }
+        return {
+            'requisicoes': dict(self.requisicoes),
+            'recusadas': self.recusadas,
+            'erros': self.erros,
+            'fila': self.pendentes,
+            'max_fila': self.max_fila,
+            'maior_fila_observada': self.max_pendentes,
+            'latencia': latencias,
+        }
+
+    async def _cifrar(self, requisicao, operacao):
+        texto = requisicao['texto']
+        funcao = FUNCOES_CIFRA[operacao]
+        argumentos = (texto, requisicao['chave'], MOTOR_PADRAO,
+                      int(requisicao.get('fase', 0)))
+        if len(texto) <= LIMITE_CIFRA_DIRETA:
+            return funcao(*argumentos)
+        return await self._no_pool(funcao, *argumentos)
+
+    async def _atacar(self, requisicao, parciais):
+        identificador = requisicao.get('id')
+        if requisicao.get('continua'):
+            return {'recebidos': parciais.adicionar(identificador,
+                                                    requisicao['texto'])}
+        texto = parciais.retirar(identificador) + requisicao['texto']
+        metodo_tamanho = requisicao.get('metodo_tamanho', 'ic')
+        if metodo_tamanho not in analise.METODOS_TAMANHO:
+            raise ValueError(f"Método de tamanho desconhecido: {metodo_tamanho}")
+        return await self._no_pool(
+            _atacar_servico, texto, int(requisicao.get('max_tam_chave', 20)),
+            metodo_tamanho, requisicao.get('idioma', IDIOMA_PADRAO))
+
+    async def _processar(self, linha, parciais):
+        inicio = time.perf_counter()
+        identificador = None
+        operacao = None
+        try:
+            requisicao = json.loads(linha)
+            identificador = requisicao.get('id')
+            operacao = requisicao.get('operacao')
+            if operacao not in OPERACOES:
+                raise ValueError(f"Operação desconhecida: {operacao}")
+            self.requisicoes[operacao] += 1
+            if operacao == 'metricas':
+                resultado = self.metricas()
+            elif operacao == 'atacar':
+                resultado = await self._atacar(requisicao, parciais)
+            else:
+                resultado = await self._cifrar(requisicao, operacao)
+            resposta = {'id': identificador, 'ok': True, 'resultado': resultado}
+        except Sobrecarregado:
+            resposta = {'id': identificador, 'ok': False, 'erro': 'sobrecarregado'}
+        except Exception as erro:
+            # Qualquer falha (entrada inválida, OverflowError, pool quebrado,
+            # falta de memória) vira uma resposta: o cliente nunca fica sem
+            # retorno para um id.
+            self.erros += 1
+            resposta = {'id': identificador, 'ok': False,
+                        'erro': f"{type(erro).__name__}: {erro}"}
+        if operacao in OPERACOES:
+            self.latencias[operacao].append(time.perf_counter() - inicio)
+        return resposta
+
+    async def _atender(self, leitor, escritor):
+        # Cada linha vira uma tarefa; o semáforo limita as tarefas abertas
+        # por conexão, e a leitura para (pressão no TCP) quando ele esgota.
+        parciais = TextosParciais()
+        vagas = asyncio.Semaphore(2 * self.max_fila)
+        tarefas = set()
+
+        async def responder(linha):
+            try:
+                resposta = await self._processar(linha, parciais)
+                escritor.write(json.dumps(resposta).encode('utf-8') + b'\n')
+                await escritor.drain()
+            except ConnectionError:
+                pass
+            finally:
+                vagas.release()
+
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    escritor.write(json.dumps({
+                        'id': None, 'ok': False,
+                        'erro': f"Linha maior que {MAX_LINHA} bytes."}).encode('utf-8') + b'\n')
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                await vagas.acquire()
+                tarefa = asyncio.create_task(responder(linha))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas)
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+
+async def _executar(args):
+    servidor = ServidorVigenere(args.processos, args.max_fila)
+    servidor_rede = await servidor.iniciar(args.host, args.porta, args.unix)
+    enderecos = ", ".join(str(socket.getsockname())
+                          for socket in servidor_rede.sockets)
+    print(f"Servindo em {enderecos} (fila máxima {args.max_fila}).", flush=True)
+    try:
+        await servidor.servir()
+    finally:
+        await servidor.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serviço local de cifra e ataque Vigenère (JSON por linha).")
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--unix', help="Caminho de um socket Unix em vez de TCP.")
+    parser.add_argument('-p', '--processos', type=int)
+    parser.add_argument('--max-fila', type=int, default=MAX_FILA_PADRAO,
+                        help="Tarefas pendentes no pool antes de recusar.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_executar(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()